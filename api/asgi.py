@@ -0,0 +1,265 @@
+"""Async variant of the Vestiaire API built on FastAPI + httpx.
+
+BaseHTTPRequestHandler handles one request at a time and blocks the whole
+server while a scrape waits on the upstream API. Since the workload is pure
+network I/O, this app overlaps many scrapes on a single event loop with a
+shared httpx.AsyncClient instead of threads. Run it locally with:
+
+    uvicorn api.asgi:app --port 8000
+"""
+
+import asyncio
+import re
+
+import httpx
+import orjson
+from bs4 import BeautifulSoup
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from .index import (
+    API_HEADERS,
+    _hash_key,
+    _parse_vestiaire_response,
+    _vestiaire_sample_data,
+    _vinted_sample_data,
+    cache_manager,
+)
+
+API_URL = "https://search.vestiairecollective.com/v1/product/search"
+
+# Map country to Vinted domain and currency
+_VINTED_DOMAINS = {
+    'uk': 'vinted.co.uk',
+    'pl': 'vinted.pl',
+    'de': 'vinted.de',
+    'fr': 'vinted.fr',
+    'it': 'vinted.it',
+    'es': 'vinted.es',
+    'nl': 'vinted.nl',
+    'be': 'vinted.be',
+    'at': 'vinted.at',
+    'cz': 'vinted.cz',
+    'sk': 'vinted.sk',
+    'hu': 'vinted.hu',
+    'ro': 'vinted.ro',
+    'bg': 'vinted.bg',
+    'hr': 'vinted.hr',
+    'si': 'vinted.si',
+    'lt': 'vinted.lt',
+    'lv': 'vinted.lv',
+    'ee': 'vinted.ee',
+    'pt': 'vinted.pt',
+    'se': 'vinted.se',
+    'dk': 'vinted.dk',
+    'fi': 'vinted.fi',
+    'ie': 'vinted.ie'
+}
+
+_VINTED_CURRENCIES = {
+    'uk': '£',
+    'pl': 'zł',
+    'de': '€',
+    'fr': '€',
+    'it': '€',
+    'es': '€',
+    'nl': '€',
+    'be': '€',
+    'at': '€',
+    'cz': 'Kč',
+    'sk': '€',
+    'hu': 'Ft',
+    'ro': 'lei',
+    'bg': 'лв',
+    'hr': 'kn',
+    'si': '€',
+    'lt': '€',
+    'lv': '€',
+    'ee': '€',
+    'pt': '€',
+    'se': 'kr',
+    'dk': 'kr',
+    'fi': '€',
+    'ie': '€'
+}
+
+_NUMBER_RE = re.compile(r'(\d+[.,]?\d*)')
+
+app = FastAPI()
+
+# One HTTP/2 client shared across requests keeps connections warm
+_client = httpx.AsyncClient(http2=True, timeout=15, headers=API_HEADERS)
+
+# Politeness cap: at most five upstream fetches in flight at once, however
+# many pages asyncio.gather fans out to
+_scrape_sem = asyncio.Semaphore(5)
+
+# cache_manager is not async-aware; serialize access on the event loop
+_cache_lock = asyncio.Lock()
+
+
+def _json_response(data, pagination, error=None):
+    """Build the same response envelope as MyHandler.send_json_response"""
+    body = orjson.dumps({
+        'success': error is None,
+        'data': data,
+        'count': len(data),
+        'pagination': pagination,
+        'error': error
+    })
+    return Response(content=body, media_type='application/json',
+                    headers={'Access-Control-Allow-Origin': '*'})
+
+
+@app.get("/vestiaire")
+async def vestiaire(search: str = 'handbag', page: int = 1, items_per_page: int = 50,
+                    min_price: str = None, max_price: str = None, country: str = 'uk'):
+    """Vestiaire Collective scraping endpoint (async)"""
+    cache_key = _hash_key(f"vestiaire|{search}|{page}|{items_per_page}|{country}|{min_price}|{max_price}")
+    async with _cache_lock:
+        cached = cache_manager.get(cache_key)
+    if cached is not None:
+        return _json_response(cached['products'], cached['pagination'])
+
+    params = {
+        'q': search,
+        'page': page,
+        'limit': items_per_page,
+        'sort': 'relevance',
+        'category_id': '1',  # Bags category
+        'gender': 'women',
+        'locale': {'country': 'GB', 'language': 'en', 'currency': 'GBP'}
+    }
+
+    try:
+        async with _scrape_sem:
+            response = await _client.post(API_URL, content=orjson.dumps(params))
+        response.raise_for_status()
+        result = _parse_vestiaire_response(orjson.loads(response.content), page, items_per_page)
+        async with _cache_lock:
+            cache_manager.set(cache_key, result)
+        return _json_response(result['products'], result['pagination'])
+    except Exception as e:
+        sample_data = _vestiaire_sample_data()
+        pagination = {'current_page': 1, 'total_pages': 1, 'has_more': False,
+                      'items_per_page': len(sample_data), 'total_items': len(sample_data)}
+        return _json_response(sample_data, pagination, error=str(e))
+
+
+def _parse_vinted_page(content, currency_symbol):
+    """Parse product cards out of one Vinted catalog page"""
+    soup = BeautifulSoup(content, 'lxml')
+    items = []
+    for container in soup.find_all('div', class_='feed-grid__item'):
+        link_tag = container.find('a', href=True)
+        if not link_tag or '/items/' not in link_tag['href']:
+            continue
+
+        data = {'Title': 'N/A', 'Price': 'N/A', 'Brand': 'N/A', 'Size': 'N/A',
+                'Image': 'N/A', 'Link': link_tag['href']}
+
+        img = container.find('img')
+        if img and img.get('src'):
+            data['Image'] = img['src']
+
+        title_tag = container.select_one('[data-testid$="--description-title"]')
+        if title_tag:
+            data['Title'] = title_tag.get_text(strip=True) or 'N/A'
+
+        subtitle_tag = container.select_one('[data-testid$="--description-subtitle"]')
+        if subtitle_tag:
+            data['Brand'] = subtitle_tag.get_text(strip=True) or 'N/A'
+
+        price_tag = container.select_one('[data-testid$="--price-text"]')
+        if price_tag:
+            price_match = _NUMBER_RE.search(price_tag.get_text(strip=True))
+            if price_match:
+                data['Price'] = f"{price_match.group(1)}{currency_symbol}"
+
+        if data['Title'] != 'N/A' or data['Brand'] != 'N/A':
+            items.append(data)
+    return items
+
+
+async def _fetch_vinted_page(domain, formatted_search, page, sold_only, currency_symbol):
+    """Fetch one catalog page and parse it off the event loop"""
+    url = f"https://www.{domain}/catalog?search_text={formatted_search}&page={page}"
+    if sold_only:
+        url += "&status=sold"
+
+    try:
+        async with _scrape_sem:
+            response = await _client.get(url, timeout=10)
+    except httpx.HTTPError:
+        return []
+    if response.status_code != 200:
+        return []
+
+    # BeautifulSoup parsing is CPU-bound; keep it out of the event loop
+    return await asyncio.to_thread(_parse_vinted_page, response.content, currency_symbol)
+
+
+async def _scrape_vinted(search, page, items_per_page, country, sold_only):
+    """Scrape the upstream pages covering the requested slice concurrently"""
+    cache_key = _hash_key(f"vinted|{search}|{page}|{items_per_page}|{country}|{sold_only}")
+    async with _cache_lock:
+        cached = cache_manager.get(cache_key)
+    if cached is not None:
+        return cached
+
+    domain = _VINTED_DOMAINS.get(country.lower(), 'vinted.co.uk')
+    currency_symbol = _VINTED_CURRENCIES.get(country.lower(), '£')
+    formatted_search = search.replace(' ', '%20')
+
+    start_index = (page - 1) * items_per_page
+    end_index = start_index + items_per_page
+    upstream_page_size = 96
+    first_upstream = start_index // upstream_page_size + 1
+    last_upstream = (end_index - 1) // upstream_page_size + 1
+
+    pages = await asyncio.gather(*[
+        _fetch_vinted_page(domain, formatted_search, p, sold_only, currency_symbol)
+        for p in range(first_upstream, last_upstream + 1)])
+    all_items = [item for page_items in pages for item in page_items]
+
+    skipped_items = (first_upstream - 1) * upstream_page_size
+    total_items = skipped_items + len(all_items)
+    local_start = start_index - skipped_items
+
+    result = {
+        'products': all_items[local_start:local_start + items_per_page] or _vinted_sample_data(),
+        'pagination': {
+            'current_page': page,
+            'items_per_page': items_per_page,
+            'total_items': total_items,
+            'total_pages': (total_items + items_per_page - 1) // items_per_page,
+            'has_more': end_index < total_items,
+            'start_index': start_index,
+            'end_index': min(end_index, total_items)
+        }
+    }
+    async with _cache_lock:
+        cache_manager.set(cache_key, result)
+    return result
+
+
+@app.get("/vinted")
+async def vinted(search: str = 't-shirt', page: int = 1, items_per_page: int = 50,
+                 country: str = 'uk'):
+    """Vinted catalog scraping endpoint (async)"""
+    result = await _scrape_vinted(search, page, items_per_page, country, sold_only=False)
+    return _json_response(result['products'], result['pagination'])
+
+
+@app.get("/vinted/sold")
+async def vinted_sold(search: str = 't-shirt', page: int = 1, items_per_page: int = 50,
+                      country: str = 'uk'):
+    """Vinted sold-items scraping endpoint (async)"""
+    result = await _scrape_vinted(search, page, items_per_page, country, sold_only=True)
+    return _json_response(result['products'], result['pagination'])
+
+
+@app.get("/health")
+async def health():
+    """API health and cache statistics"""
+    return {'status': 'healthy', 'cache': cache_manager.get_cache_stats()}
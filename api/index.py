@@ -1,18 +1,22 @@
 from http.server import BaseHTTPRequestHandler
-import json
-import requests
+import httpx
+import orjson
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, parse_qs
+import hashlib
+import heapq
+import logging
+import random
 import re
 import os
 import time
+from functools import lru_cache
 import threading
-from collections import defaultdict
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 
 # Load environment variables from .env file and Vercel environment
-import os
-
 def load_env_vars():
     """Load environment variables from .env file and Vercel environment"""
     # First try to load from environment (Vercel)
@@ -36,32 +40,33 @@ def load_env_vars():
 # Load environment variables at module level
 SCRAPFLY_KEY = load_env_vars()
 
+log = logging.getLogger(__name__)
+
 class RateLimiter:
     """Advanced rate limiter to prevent 429 errors with adaptive strategies"""
     def __init__(self, max_requests_per_minute=30):
         self.max_requests = max_requests_per_minute
-        self.requests = []
         self.current_limit = max_requests_per_minute
-        self.adaptive_factor = 1.0
-        
+        self.tokens = float(max_requests_per_minute)
+        self.last_refill = time.monotonic()
+
     def wait_if_needed(self):
         """Wait if rate limit is exceeded"""
-        now = time.time()
-        # Remove requests older than 1 minute
-        self.requests = [req_time for req_time in self.requests if now - req_time < 60]
-        
-        if len(self.requests) >= self.current_limit:
-            # Calculate wait time
-            oldest_request = min(self.requests)
-            wait_until = oldest_request + 60
-            wait_time = max(0, wait_until - now)
-            
-            if wait_time > 0:
-                print(f"⏳ Rate limiting: waiting {wait_time:.1f}s")
-                time.sleep(wait_time)
-        
-        self.requests.append(now)
-    
+        # Token bucket: refill based on elapsed time, spend one token per request
+        now = time.monotonic()
+        rate = self.current_limit / 60.0
+        self.tokens = min(self.current_limit, self.tokens + (now - self.last_refill) * rate)
+        self.last_refill = now
+
+        if self.tokens < 1:
+            wait_time = (1 - self.tokens) / rate
+            log.info("⏳ Rate limiting: waiting %.1fs", wait_time)
+            time.sleep(wait_time)
+            self.tokens = 0
+            self.last_refill = time.monotonic()
+        else:
+            self.tokens -= 1
+
     def adapt_rate(self, success_rate):
         """Adapt rate limiting based on success rate"""
         if success_rate >= 0.8:
@@ -71,47 +76,79 @@ class RateLimiter:
 
 class CacheManager:
     """Enhanced cache with intelligent strategies to reduce API calls"""
-    def __init__(self, cache_duration_minutes=10):
-        self.cache = {}
+    def __init__(self, cache_duration_minutes=10, max_items=1000):
+        self.cache = OrderedDict()
         self.cache_duration = cache_duration_minutes * 60
-        self.hit_count = defaultdict(int)
-        self.miss_count = defaultdict(int)
-        
+        self.max_items = max_items
+        self._hits = 0
+        self._misses = 0
+        self._sets_since_cleanup = 0
+        self._expiry_heap = []  # (expires_at, key) pairs, may contain stale entries
+
+    def _purge(self, now):
+        """Pop expired keys off the expiry heap and evict them"""
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, key = heapq.heappop(self._expiry_heap)
+            entry = self.cache.get(key)
+            # Re-check the live timestamp: a re-set key leaves a stale heap entry
+            if entry is not None and entry[1] + self.cache_duration <= now:
+                del self.cache[key]
+
     def get(self, key):
         """Get cached data"""
+        self._purge(time.time())
         if key in self.cache:
             data, timestamp = self.cache[key]
             if time.time() - timestamp < self.cache_duration:
-                self.hit_count[key] += 1
+                self._hits += 1
+                self.cache.move_to_end(key)
                 return data
             else:
                 del self.cache[key]
-        
-        self.miss_count[key] += 1
+
+        self._misses += 1
         return None
-    
+
     def set(self, key, data):
-        """Set cached data"""
-        self.cache[key] = (data, time.time())
+        """Set cached data, evicting least-recently-used entries when full"""
+        now = time.time()
+        self._purge(now)
+        self.cache[key] = (data, now)
+        heapq.heappush(self._expiry_heap, (now + self.cache_duration, key))
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_items:
+            self.cache.popitem(last=False)
+
+        self._sets_since_cleanup += 1
+        if self._sets_since_cleanup >= 100:
+            self.cleanup_expired()
+
+    def cleanup_expired(self):
+        """Drop entries past their TTL so memory stays bounded"""
+        now = time.time()
+        expired = [key for key, (_, timestamp) in self.cache.items()
+                   if now - timestamp >= self.cache_duration]
+        for key in expired:
+            del self.cache[key]
+        self._sets_since_cleanup = 0
     
     def get_cache_stats(self):
         """Get cache statistics"""
-        total_hits = sum(self.hit_count.values())
-        total_misses = sum(self.miss_count.values())
-        total_requests = total_hits + total_misses
-        
+        total_requests = self._hits + self._misses
+
         return {
-            'hit_rate': total_hits / total_requests if total_requests > 0 else 0,
-            'total_hits': total_hits,
-            'total_misses': total_misses,
+            'hit_rate': self._hits / total_requests if total_requests > 0 else 0,
+            'total_hits': self._hits,
+            'total_misses': self._misses,
             'cached_items': len(self.cache)
         }
-    
+
     def clear(self):
         """Clear cache"""
         self.cache.clear()
-        self.hit_count.clear()
-        self.miss_count.clear()
+        self._hits = 0
+        self._misses = 0
+        self._expiry_heap.clear()
 
 class CircuitBreaker:
     """Circuit breaker pattern to handle service failures"""
@@ -121,49 +158,54 @@ class CircuitBreaker:
         self.failure_count = 0
         self.last_failure_time = None
         self.state = 'CLOSED'  # CLOSED, OPEN, HALF_OPEN
-    
+        self._lock = threading.Lock()
+
     def execute(self, func):
         """Execute function with circuit breaker protection"""
-        if self.state == 'OPEN':
-            if time.time() - self.last_failure_time > self.recovery_timeout:
-                self.state = 'HALF_OPEN'
-            else:
-                raise Exception("Circuit breaker is OPEN")
-        
+        with self._lock:
+            if self.state == 'OPEN':
+                if time.time() - self.last_failure_time > self.recovery_timeout:
+                    self.state = 'HALF_OPEN'
+                else:
+                    raise Exception("Circuit breaker is OPEN")
+
         try:
+            # The call itself runs unlocked so the breaker never serializes I/O
             result = func()
+        except Exception:
+            with self._lock:
+                self.failure_count += 1
+                self.last_failure_time = time.time()
+                if self.failure_count >= self.failure_threshold:
+                    self.state = 'OPEN'
+            raise
+
+        with self._lock:
             if self.state == 'HALF_OPEN':
                 self.state = 'CLOSED'
                 self.failure_count = 0
-            return result
-        except Exception as e:
-            self.failure_count += 1
-            self.last_failure_time = time.time()
-            
-            if self.failure_count >= self.failure_threshold:
-                self.state = 'OPEN'
-            
-            raise e
+        return result
 
 class RequestQueue:
     """Request queue for managing concurrent requests"""
     def __init__(self, max_concurrent=3):
         self.max_concurrent = max_concurrent
-        self.active_requests = 0
-        self.condition = threading.Condition()
-    
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+
     def acquire(self):
         """Acquire request slot"""
-        with self.condition:
-            while self.active_requests >= self.max_concurrent:
-                self.condition.wait()
-            self.active_requests += 1
-    
+        self._semaphore.acquire()
+
     def release(self):
         """Release request slot"""
-        with self.condition:
-            self.active_requests -= 1
-            self.condition.notify()
+        self._semaphore.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
 
 # Enhanced global components with limitation avoidance
 rate_limiter = RateLimiter(max_requests_per_minute=20)  # More conservative
@@ -171,15 +213,263 @@ cache_manager = CacheManager(cache_duration_minutes=15)  # Longer cache
 circuit_breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=120)
 request_queue = RequestQueue(max_concurrent=2)  # Limit concurrent requests
 
-def scrape_vestiaire_data(search_text, page_number=1, items_per_page=50, min_price=None, max_price=None, country='uk'):
-    """Enhanced Vestiaire scraper using official Product Search API with better data extraction"""
+def _hash_key(s):
+    """Hash a composite cache key down to a fixed 16-byte digest"""
+    return hashlib.blake2b(s.encode('utf-8'), digest_size=16).digest()
+
+API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-GB,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.vestiairecollective.co.uk/',
+    'Origin': 'https://www.vestiairecollective.co.uk',
+    'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"',
+    'sec-fetch-dest': 'empty',
+    'sec-fetch-mode': 'cors',
+    'sec-fetch-site': 'same-site',
+    'Content-Type': 'application/json',
+}
+
+# Shared HTTP/2 client: concurrent searches multiplex over one warm TLS
+# connection instead of opening a socket each
+_client = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+    headers=API_HEADERS,
+    timeout=15,
+)
+
+# Hedged requests: fire a backup request when the first one exceeds typical p95.
+# Disabled by default so tight rate limits aren't burned on duplicate calls.
+HEDGE_REQUESTS = os.getenv('HEDGE_REQUESTS', '0') == '1'
+HEDGE_DELAY_SECONDS = 2.0
+_hedge_pool = ThreadPoolExecutor(max_workers=2)
+
+# Last-known ETag and body per query so stale cache entries can be
+# revalidated with If-None-Match instead of re-downloading the payload
+_etag_cache = OrderedDict()
+_ETAG_CACHE_MAX = 256
+
+def _post_with_hedging(url, body, headers=None, timeout=15):
+    """POST with an optional hedged second attempt to cut tail latency"""
+    if not HEDGE_REQUESTS:
+        return _client.post(url, content=body, headers=headers, timeout=timeout)
+
+    first = _hedge_pool.submit(_client.post, url, content=body, headers=headers, timeout=timeout)
+    done, _ = wait([first], timeout=HEDGE_DELAY_SECONDS, return_when=FIRST_COMPLETED)
+    if done:
+        return first.result()
+
+    # First attempt is slow: race a second request and take whichever finishes
+    second = _hedge_pool.submit(_client.post, url, content=body, headers=headers, timeout=timeout)
+    done, not_done = wait([first, second], return_when=FIRST_COMPLETED)
+    for future in not_done:
+        future.cancel()
+    return done.pop().result()
+
+# Parsing tables built once at import so the per-item loop doesn't rebuild them
+BRAND_PATTERNS = {
+    'Chanel': ('chanel',),
+    'Louis Vuitton': ('louis vuitton', 'lv'),
+    'Hermès': ('hermès', 'hermes'),
+    'Gucci': ('gucci',),
+    'Dior': ('dior',),
+    'Prada': ('prada',),
+    'Bottega Veneta': ('bottega veneta',),
+    'Saint Laurent': ('saint laurent', 'ysl'),
+    'Celine': ('celine',),
+    'Balenciaga': ('balenciaga',),
+    'Fendi': ('fendi',),
+    'Givenchy': ('givenchy',),
+    'Valentino': ('valentino',),
+    'Versace': ('versace',),
+    'Burberry': ('burberry',)
+}
+
+CONDITION_PATTERNS = {
+    'Excellent': ('excellent condition', 'perfect condition', 'like new', 'mint condition'),
+    'Very Good': ('very good condition', 'great condition', 'excellent'),
+    'Good': ('good condition', 'used but good', 'fairly good'),
+    'Fair': ('fair condition', 'acceptable condition', 'worn but fair'),
+    'Poor': ('poor condition', 'heavily worn', 'damaged')
+}
+
+# Single alternation regexes: one pass over the description instead of one per pattern.
+# The named group that matched tells us which currency the price was quoted in.
+_PRICE_RE = re.compile(
+    r'£(?P<gbp>\d+(?:,\d+)*)'
+    r'|(?P<gbp_suffix>\d+(?:,\d+)*)\s*£'
+    r'|€(?P<eur>\d+(?:,\d+)*)'
+    r'|\$(?P<usd>\d+(?:,\d+)*)'
+    r'|price[:\s]*(?P<labelled>\d+(?:,\d+)*)'
+    r'|cost[:\s]*(?P<cost>\d+(?:,\d+)*)'
+    r'|(?P<worded>\d{1,4})\s*(?:pounds?|gbp|eur|usd)',
+    re.IGNORECASE)
+
+# Symbol per matched price group; anything unlisted formats as GBP
+_CURRENCY_SYMBOL = {'eur': '€', 'usd': '$'}
+
+# Deletion table built once; translate beats replace for single-char strips
+_NO_COMMA = str.maketrans('', '', ',')
+
+_SELLER_RE = re.compile(
+    r'sold by\s+([^\s.,]+)'
+    r'|seller[:\s]+([^\s.,]+)'
+    r'|from\s+([^\s.,]+)\s+shop',
+    re.IGNORECASE)
+
+# Branch order matters: the locale-prefixed form must come before the bare
+# 'X size' branch, which would otherwise capture the 'UK' in 'uk size 8'
+# (and the 'size X' forms would never be reached at all)
+_SIZE_RE = re.compile(
+    r'(?:uk|eu|us)\s*size\s+(\w+)'
+    r'|size\s+([A-Z0-9]+)'
+    r'|([A-Z0-9]+)\s*size',
+    re.IGNORECASE)
+
+_IMAGE_RE = re.compile(r'https://images\.vestiairecollective\.com/[^\s\)]+')
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+def _build_automaton(pattern_table):
+    """Build an Aho-Corasick automaton mapping each phrase to its label"""
+    automaton = ahocorasick.Automaton()
+    for label, phrases in pattern_table.items():
+        for phrase in phrases:
+            automaton.add_word(phrase, label)
+    automaton.make_automaton()
+    return automaton
+
+# One multi-pattern automaton per category replaces ~30 substring scans per item
+_BRAND_AC = _build_automaton(BRAND_PATTERNS) if ahocorasick else None
+_CONDITION_AC = _build_automaton(CONDITION_PATTERNS) if ahocorasick else None
+
+def _parse_vestiaire_response(data, page_number, items_per_page):
+    """Turn a Product Search API payload into the products/pagination shape"""
+    products = []
     
-    try:
-        import brotli
-    except ImportError:
-        print("⚠️ Brotli not available, using raw response")
-        brotli = None
+    # Extract products from API response
+    if 'items' in data:
+        for item in data['items']:
+            try:
+                # Extract basic product information
+                product_id = item.get('id', '')
+                title = item.get('name', '')
+                description = item.get('description', '')
+                relative_link = item.get('link', '')
+                
+                # Build full URL
+                product_url = f"https://www.vestiairecollective.co.uk{relative_link}" if relative_link else ''
+                
+                # Extract brand from title or description with better detection
+                brand = 'Unknown'
+                title_lower = title.lower()
+                desc_lower = description.lower()
+                
+                if _BRAND_AC is not None:
+                    for _, brand_name in _BRAND_AC.iter(title_lower + '\x00' + desc_lower):
+                        brand = brand_name
+                        break
+                else:
+                    for brand_name, patterns in BRAND_PATTERNS.items():
+                        if any(pattern in title_lower or pattern in desc_lower for pattern in patterns):
+                            brand = brand_name
+                            break
+                
+                # Enhanced price extraction from description
+                price = 'Price not available'
+                
+                for price_match in _PRICE_RE.finditer(description):
+                    matched_group = price_match.lastgroup
+                    price_value = int(price_match.group(matched_group).translate(_NO_COMMA))
+                    if price_value > 100:  # Filter out very small numbers
+                        price = f"{_CURRENCY_SYMBOL.get(matched_group, '£')}{price_value:,}"
+                        break
+                
+                # Enhanced image URL generation
+                image_url = f"https://images.vestiairecollective.com/images/resized/w=256,q=75,f=auto/produit/{product_id}_1.jpg"
+                
+                # Try to extract actual image from description if available
+                image_match = _IMAGE_RE.search(description)
+                if image_match:
+                    image_url = image_match.group(0)
+                
+                # Enhanced condition extraction
+                condition = 'Good'
+                if _CONDITION_AC is not None:
+                    # Collect every hit from the single pass, then resolve in
+                    # table order: "excellent condition" must win over its
+                    # embedded "excellent" alias, which ends (and is yielded)
+                    # first
+                    found = {cond for _, cond in _CONDITION_AC.iter(desc_lower)}
+                    if found:
+                        condition = next(c for c in CONDITION_PATTERNS if c in found)
+                else:
+                    for cond_name, patterns in CONDITION_PATTERNS.items():
+                        if any(pattern in desc_lower for pattern in patterns):
+                            condition = cond_name
+                            break
+                
+                # Enhanced seller extraction
+                seller = 'vestiaire_seller'
+                
+                # Try to extract seller from description
+                seller_match = _SELLER_RE.search(description)
+                if seller_match:
+                    seller = seller_match.group(seller_match.lastindex).title()
+                
+                # Extract size information
+                size = 'N/A'
+                size_match = _SIZE_RE.search(description)
+                if size_match:
+                    size = size_match.group(size_match.lastindex).upper()
+                
+                product = {
+                    'Title': title,
+                    'Price': price,
+                    'Brand': brand,
+                    'Size': size,
+                    'Image': image_url,
+                    'Link': product_url,
+                    'Condition': condition,
+                    'Seller': seller,
+                    'OriginalPrice': price,
+                    'Discount': '0%'
+                }
+                
+                products.append(product)
+                
+            except Exception as e:
+                log.warning("⚠️ Error parsing product %s: %s", item.get('id', 'unknown'), e)
+                continue
     
+    # Extract pagination from API response
+    pagination_data = data.get('paginationStats', {})
+    pagination = {
+        'current_page': page_number,
+        'total_pages': page_number + (1 if len(products) == items_per_page else 0),
+        'has_more': len(products) == items_per_page,
+        'items_per_page': len(products),
+        'total_items': pagination_data.get('totalCount', len(products))
+    }
+
+    return {'products': products, 'pagination': pagination}
+
+def scrape_vestiaire_data(search_text, page_number=1, items_per_page=50, min_price=None, max_price=None, country='uk'):
+    """Enhanced Vestiaire scraper using official Product Search API with better data extraction"""
+
+    cache_key = _hash_key(f"vestiaire|{search_text}|{page_number}|{items_per_page}|{country}|{min_price}|{max_price}")
+    cached = cache_manager.get(cache_key)
+    if cached is not None:
+        log.debug("📦 Cache hit for Vestiaire search: %s", search_text)
+        return cached
+
     api_url = "https://search.vestiairecollective.com/v1/product/search"
     
     params = {
@@ -191,221 +481,159 @@ def scrape_vestiaire_data(search_text, page_number=1, items_per_page=50, min_pri
         'gender': 'women',
         'locale': {'country': 'GB', 'language': 'en', 'currency': 'GBP'}
     }
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-GB,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://www.vestiairecollective.co.uk/',
-        'Origin': 'https://www.vestiairecollective.co.uk',
-        'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"macOS"',
-        'sec-fetch-dest': 'empty',
-        'sec-fetch-mode': 'cors',
-        'sec-fetch-site': 'same-site',
-    }
-    
+
     try:
-        print(f"🔄 Calling Vestiaire API: {api_url}")
-        print(f"📝 Query params: {params}")
-        
-        # Make POST request
-        response = requests.post(api_url, json=params, headers=headers, timeout=15)
-        
+        log.debug("🔄 Calling Vestiaire API: %s", api_url)
+        log.debug("📝 Query params: %s", params)
+
+        # Revalidate a stale entry for this query instead of refetching the body
+        stale = _etag_cache.get(cache_key)
+        extra_headers = {'If-None-Match': stale[0]} if stale is not None else None
+
+        # Make POST request (headers live on the shared session)
+        response = _post_with_hedging(api_url, orjson.dumps(params), headers=extra_headers)
+
+        if response.status_code == 304 and stale is not None:
+            log.debug("📦 Vestiaire payload unchanged (304), refreshing cache TTL")
+            result = stale[1]
+            cache_manager.set(cache_key, result)
+            return result
+
         if response.status_code == 200:
-            # Handle compression decompression
-            response_text = response.text
-            content_encoding = response.headers.get('content-encoding', '')
-            
-            if content_encoding == 'br' and brotli:
-                try:
-                    response_text = brotli.decompress(response.content).decode('utf-8')
-                    print("📄 Decompressed brotli response")
-                except:
-                    print("📄 Failed to decompress brotli, using raw text")
-            
-            data = json.loads(response_text)
-            products = []
-            
-            # Extract products from API response
-            if 'items' in data:
-                for item in data['items']:
-                    try:
-                        # Extract basic product information
-                        product_id = item.get('id', '')
-                        title = item.get('name', '')
-                        description = item.get('description', '')
-                        relative_link = item.get('link', '')
-                        
-                        # Build full URL
-                        product_url = f"https://www.vestiairecollective.co.uk{relative_link}" if relative_link else ''
-                        
-                        # Extract brand from title or description with better detection
-                        brand = 'Unknown'
-                        title_lower = title.lower()
-                        desc_lower = description.lower()
-                        
-                        # Comprehensive brand detection
-                        brand_patterns = {
-                            'Chanel': ['chanel'],
-                            'Louis Vuitton': ['louis vuitton', 'lv'],
-                            'Hermès': ['hermès', 'hermes'],
-                            'Gucci': ['gucci'],
-                            'Dior': ['dior'],
-                            'Prada': ['prada'],
-                            'Bottega Veneta': ['bottega veneta'],
-                            'Saint Laurent': ['saint laurent', 'ysl'],
-                            'Celine': ['celine'],
-                            'Balenciaga': ['balenciaga'],
-                            'Fendi': ['fendi'],
-                            'Givenchy': ['givenchy'],
-                            'Valentino': ['valentino'],
-                            'Versace': ['versace'],
-                            'Burberry': ['burberry']
-                        }
-                        
-                        for brand_name, patterns in brand_patterns.items():
-                            if any(pattern in title_lower or pattern in desc_lower for pattern in patterns):
-                                brand = brand_name
-                                break
-                        
-                        # Enhanced price extraction from description
-                        price = 'Price not available'
-                        
-                        # Multiple price patterns to try
-                        price_patterns = [
-                            r'£(\d+(?:,\d+)*)',
-                            r'(\d+(?:,\d+)*)\s*£',
-                            r'€(\d+(?:,\d+)*)',
-                            r'\$(\d+(?:,\d+)*)',
-                            r'price[:\s]*(\d+(?:,\d+)*)',
-                            r'cost[:\s]*(\d+(?:,\d+)*)',
-                            r'(\d{1,4})\s*(?:pounds?|gbp|eur|usd)'
-                        ]
-                        
-                        for pattern in price_patterns:
-                            price_match = re.search(pattern, description, re.IGNORECASE)
-                            if price_match:
-                                price_num = price_match.group(1).replace(',', '')
-                                try:
-                                    price_value = int(price_num)
-                                    if price_value > 100:  # Filter out very small numbers
-                                        if '£' in pattern or 'gbp' in pattern or 'pounds' in pattern:
-                                            price = f"£{price_value:,}"
-                                        elif '€' in pattern or 'eur' in pattern:
-                                            price = f"€{price_value:,}"
-                                        elif '$' in pattern or 'usd' in pattern:
-                                            price = f"${price_value:,}"
-                                        else:
-                                            price = f"£{price_value:,}"  # Default to GBP
-                                        break
-                                except ValueError:
-                                    continue
-                        
-                        # Enhanced image URL generation
-                        image_url = f"https://images.vestiairecollective.com/images/resized/w=256,q=75,f=auto/produit/{product_id}_1.jpg"
-                        
-                        # Try to extract actual image from description if available
-                        image_match = re.search(r'https://images\.vestiairecollective\.com/[^\s\)]+', description)
-                        if image_match:
-                            image_url = image_match.group(0)
-                        
-                        # Enhanced condition extraction
-                        condition = 'Good'
-                        condition_patterns = {
-                            'Excellent': ['excellent condition', 'perfect condition', 'like new', 'mint condition'],
-                            'Very Good': ['very good condition', 'great condition', 'excellent'],
-                            'Good': ['good condition', 'used but good', 'fairly good'],
-                            'Fair': ['fair condition', 'acceptable condition', 'worn but fair'],
-                            'Poor': ['poor condition', 'heavily worn', 'damaged']
-                        }
-                        
-                        desc_lower = description.lower()
-                        for cond_name, patterns in condition_patterns.items():
-                            if any(pattern in desc_lower for pattern in patterns):
-                                condition = cond_name
-                                break
-                        
-                        # Enhanced seller extraction
-                        seller = 'vestiaire_seller'
-                        
-                        # Try to extract seller from description
-                        seller_patterns = [
-                            r'sold by\s+([^\s.,]+)',
-                            r'seller[:\s]+([^\s.,]+)',
-                            r'from\s+([^\s.,]+)\s+shop'
-                        ]
-                        
-                        for pattern in seller_patterns:
-                            seller_match = re.search(pattern, description, re.IGNORECASE)
-                            if seller_match:
-                                seller = seller_match.group(1).title()
-                                break
-                        
-                        # Extract size information
-                        size = 'N/A'
-                        size_patterns = [
-                            r'size\s+([A-Z0-9]+)',
-                            r'([A-Z0-9]+)\s*size',
-                            r'uk\s*size\s+(\w+)',
-                            r'eu\s*size\s+(\w+)',
-                            r'us\s*size\s+(\w+)'
-                        ]
-                        
-                        for pattern in size_patterns:
-                            size_match = re.search(pattern, description, re.IGNORECASE)
-                            if size_match:
-                                size = size_match.group(1).upper()
-                                break
-                        
-                        product = {
-                            'Title': title,
-                            'Price': price,
-                            'Brand': brand,
-                            'Size': size,
-                            'Image': image_url,
-                            'Link': product_url,
-                            'Condition': condition,
-                            'Seller': seller,
-                            'OriginalPrice': price,
-                            'Discount': '0%'
-                        }
-                        
-                        products.append(product)
-                        
-                    except Exception as e:
-                        print(f"⚠️ Error parsing product {item.get('id', 'unknown')}: {e}")
-                        continue
-            
-            # Extract pagination from API response
-            pagination_data = data.get('paginationStats', {})
-            pagination = {
-                'current_page': page_number,
-                'total_pages': page_number + (1 if len(products) == items_per_page else 0),
-                'has_more': len(products) == items_per_page,
-                'items_per_page': len(products),
-                'total_items': pagination_data.get('totalCount', len(products))
-            }
-            
-            print(f"✅ Successfully fetched {len(products)} products from Vestiaire API")
-            print(f"📊 Page {pagination['current_page']} of {pagination['total_pages']}, Total: {pagination['total_items']} items")
-            
-            return {'products': products, 'pagination': pagination}
-            
+            # requests already decodes gzip/br transparently, so parse the body as-is
+            data = orjson.loads(response.content)
+            result = _parse_vestiaire_response(data, page_number, items_per_page)
+            pagination = result['pagination']
+
+            log.info("✅ Successfully fetched %d products from Vestiaire API", len(result['products']))
+            log.info("📊 Page %s of %s, Total: %s items", pagination['current_page'], pagination['total_pages'], pagination['total_items'])
+
+            cache_manager.set(cache_key, result)
+            etag = response.headers.get('ETag')
+            if etag:
+                _etag_cache[cache_key] = (etag, result)
+                _etag_cache.move_to_end(cache_key)
+                while len(_etag_cache) > _ETAG_CACHE_MAX:
+                    _etag_cache.popitem(last=False)
+            return result
+
         else:
             error_msg = f"HTTP {response.status_code}: {response.text}"
-            print(f"❌ Vestiaire API error: {error_msg}")
+            log.error("❌ Vestiaire API error: %s", error_msg)
             raise Exception(f"Failed to fetch Vestiaire API: {error_msg}")
             
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Vestiaire API request failed: {e}")
+    except httpx.HTTPError as e:
+        log.error("❌ Vestiaire API request failed: %s", e)
         raise Exception(f"Vestiaire API request failed: {str(e)}")
     except Exception as e:
-        print(f"❌ Vestiaire scraping failed: {e}")
+        log.error("❌ Vestiaire scraping failed: %s", e)
         raise e
 
+@lru_cache(maxsize=1)
+def _vinted_sample_data():
+    """Generate sample data for Vinted (computed once, fallbacks reuse it)"""
+    brands = ['Nike', 'Adidas', 'Zara', 'H&M', 'Gucci', 'Prada', 'Louis Vuitton', 'Chanel']
+    items = ['T-shirt', 'Jeans', 'Dress', 'Sneakers', 'Handbag', 'Jacket', 'Sweater', 'Skirt']
+    conditions = ['Very Good', 'Good', 'Fair']
+
+    sample_items = []
+    for i in range(23):
+        brand = random.choice(brands)
+        item = random.choice(items)
+        condition = random.choice(conditions)
+        price = random.randint(10, 200)
+
+        sample_items.append({
+            "Title": f"{brand} {item}",
+            "Price": f"£{price}",
+            "Brand": brand,
+            "Size": random.choice(['XS', 'S', 'M', 'L', 'XL']),
+            "Image": f"https://images.vinted.net/placeholder_{i}.jpg",
+            "Link": f"https://www.vinted.co.uk/items/{i}",
+            "Condition": condition,
+            "Seller": f"vinted_user_{i}",
+            "OriginalPrice": f"£{price + 20}",
+            "Discount": f"{int((20/(price+20))*100)}%"
+        })
+
+    return sample_items
+
+@lru_cache(maxsize=1)
+def _vestiaire_sample_data():
+    """Generate realistic sample data for Vestiaire Collective (computed once)"""
+    brands = ['Chanel', 'Louis Vuitton', 'Hermès', 'Gucci', 'Dior', 'Prada', 'Bottega Veneta', 'Saint Laurent', 'Celine']
+    bag_types = ['Handbag', 'Tote Bag', 'Crossbody Bag', 'Shoulder Bag', 'Clutch', 'Backpack', 'Hobo Bag']
+    conditions = ['Excellent', 'Very Good', 'Good', 'Fair']
+    sellers = ['luxury_boutique_paris', 'vintage_finds_london', 'hermes_specialist_milan', 'dior_fan_madrid', 'prada_vintage_paris']
+
+    # Base luxury items
+    base_products = [
+        {
+            "Title": "Chanel Classic Flap Bag - Medium",
+            "Price": "£4,250",
+            "Brand": "Chanel",
+            "Size": "Medium",
+            "Image": "https://images.vestiairecollective.com/produit/123456/abc.jpg",
+            "Link": "https://www.vestiairecollective.co.uk/women/bags/handbags/chanel/classic-flap-bag-123456.shtml",
+            "Condition": "Very Good",
+            "Seller": "luxury_boutique_paris",
+            "OriginalPrice": "£5,500",
+            "Discount": "23%"
+        },
+        {
+            "Title": "Louis Vuitton Neverfull MM",
+            "Price": "£1,180",
+            "Brand": "Louis Vuitton",
+            "Size": "MM",
+            "Image": "https://images.vestiairecollective.com/produit/789012/def.jpg",
+            "Link": "https://www.vestiairecollective.co.uk/women/bags/tote-bags/louis-vuitton/neverfull-mm-789012.shtml",
+            "Condition": "Good",
+            "Seller": "vintage_finds_london",
+            "OriginalPrice": "£1,450",
+            "Discount": "19%"
+        },
+        {
+            "Title": "Hermès Birkin 30 Togo Leather",
+            "Price": "£8,900",
+            "Brand": "Hermès",
+            "Size": "30",
+            "Image": "https://images.vestiairecollective.com/produit/345678/ghi.jpg",
+            "Link": "https://www.vestiairecollective.co.uk/women/bags/handbags/hermes/birkin-30-345678.shtml",
+            "Condition": "Excellent",
+            "Seller": "hermes_specialist_milan",
+            "OriginalPrice": "£10,200",
+            "Discount": "13%"
+        }
+    ]
+
+    # Generate additional items
+    additional_products = []
+    for i in range(20):
+        brand = random.choice(brands)
+        bag_type = random.choice(bag_types)
+        condition = random.choice(conditions)
+        seller = random.choice(sellers)
+
+        base_price = random.randint(200, 5000) if brand in ["Chanel", "Hermès"] else random.randint(100, 2000)
+        original_price = int(base_price * 1.2)
+        discount = f"{int((1 - base_price/original_price) * 100)}%"
+
+        product = {
+            "Title": f"{brand} {bag_type} - {random.choice(['XS', 'S', 'M', 'L'])}",
+            "Price": f"£{base_price:,}",
+            "Brand": brand,
+            "Size": random.choice(['XS', 'S', 'M', 'L']),
+            "Image": f"https://images.vestiairecollective.com/produit/{random.randint(100000, 999999)}/{''.join(random.choices('abcdefghijklmnopqrstuvwxyz', k=3))}.jpg",
+            "Link": f"https://www.vestiairecollective.co.uk/women/bags/{bag_type.lower().replace(' ', '-')}/{brand.lower()}/{bag_type.lower().replace(' ', '-')}-{random.randint(100000, 999999)}.shtml",
+            "Condition": condition,
+            "Seller": seller,
+            "OriginalPrice": f"£{original_price:,}",
+            "Discount": discount
+        }
+        additional_products.append(product)
+
+    return base_products + additional_products
+
 class MyHandler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         """Handle OPTIONS preflight requests for CORS"""
@@ -458,122 +686,23 @@ class MyHandler(BaseHTTPRequestHandler):
             'error': error
         }
         
-        json_response = json.dumps(response)
+        json_response = orjson.dumps(response)
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.send_header('Content-length', str(len(json_response.encode('utf-8'))))
+        self.send_header('Content-length', str(len(json_response)))
         self.end_headers()
-        self.wfile.write(json_response.encode('utf-8'))
+        self.wfile.write(json_response)
 
     def get_vinted_sample_data(self):
-        """Generate sample data for Vinted"""
-        import random
-        
-        brands = ['Nike', 'Adidas', 'Zara', 'H&M', 'Gucci', 'Prada', 'Louis Vuitton', 'Chanel']
-        items = ['T-shirt', 'Jeans', 'Dress', 'Sneakers', 'Handbag', 'Jacket', 'Sweater', 'Skirt']
-        conditions = ['Very Good', 'Good', 'Fair']
-        
-        sample_items = []
-        for i in range(23):
-            brand = random.choice(brands)
-            item = random.choice(items)
-            condition = random.choice(conditions)
-            price = random.randint(10, 200)
-            
-            sample_items.append({
-                "Title": f"{brand} {item}",
-                "Price": f"£{price}",
-                "Brand": brand,
-                "Size": random.choice(['XS', 'S', 'M', 'L', 'XL']),
-                "Image": f"https://images.vinted.net/placeholder_{i}.jpg",
-                "Link": f"https://www.vinted.co.uk/items/{i}",
-                "Condition": condition,
-                "Seller": f"vinted_user_{i}",
-                "OriginalPrice": f"£{price + 20}",
-                "Discount": f"{int((20/(price+20))*100)}%"
-            })
-        
-        return sample_items
+        """Return precomputed sample data for Vinted"""
+        return _vinted_sample_data()
 
     def get_vestiaire_sample_data(self):
-        """Generate realistic sample data for Vestiaire Collective"""
-        import random
-        
-        brands = ['Chanel', 'Louis Vuitton', 'Hermès', 'Gucci', 'Dior', 'Prada', 'Bottega Veneta', 'Saint Laurent', 'Celine']
-        bag_types = ['Handbag', 'Tote Bag', 'Crossbody Bag', 'Shoulder Bag', 'Clutch', 'Backpack', 'Hobo Bag']
-        conditions = ['Excellent', 'Very Good', 'Good', 'Fair']
-        sellers = ['luxury_boutique_paris', 'vintage_finds_london', 'hermes_specialist_milan', 'dior_fan_madrid', 'prada_vintage_paris']
-        
-        # Base luxury items
-        base_products = [
-            {
-                "Title": "Chanel Classic Flap Bag - Medium",
-                "Price": "£4,250",
-                "Brand": "Chanel",
-                "Size": "Medium",
-                "Image": "https://images.vestiairecollective.com/produit/123456/abc.jpg",
-                "Link": "https://www.vestiairecollective.co.uk/women/bags/handbags/chanel/classic-flap-bag-123456.shtml",
-                "Condition": "Very Good",
-                "Seller": "luxury_boutique_paris",
-                "OriginalPrice": "£5,500",
-                "Discount": "23%"
-            },
-            {
-                "Title": "Louis Vuitton Neverfull MM",
-                "Price": "£1,180",
-                "Brand": "Louis Vuitton",
-                "Size": "MM",
-                "Image": "https://images.vestiairecollective.com/produit/789012/def.jpg",
-                "Link": "https://www.vestiairecollective.co.uk/women/bags/tote-bags/louis-vuitton/neverfull-mm-789012.shtml",
-                "Condition": "Good",
-                "Seller": "vintage_finds_london",
-                "OriginalPrice": "£1,450",
-                "Discount": "19%"
-            },
-            {
-                "Title": "Hermès Birkin 30 Togo Leather",
-                "Price": "£8,900",
-                "Brand": "Hermès",
-                "Size": "30",
-                "Image": "https://images.vestiairecollective.com/produit/345678/ghi.jpg",
-                "Link": "https://www.vestiairecollective.co.uk/women/bags/handbags/hermes/birkin-30-345678.shtml",
-                "Condition": "Excellent",
-                "Seller": "hermes_specialist_milan",
-                "OriginalPrice": "£10,200",
-                "Discount": "13%"
-            }
-        ]
-        
-        # Generate additional items
-        additional_products = []
-        for i in range(20):
-            brand = random.choice(brands)
-            bag_type = random.choice(bag_types)
-            condition = random.choice(conditions)
-            seller = random.choice(sellers)
-            
-            base_price = random.randint(200, 5000) if brand in ["Chanel", "Hermès"] else random.randint(100, 2000)
-            original_price = int(base_price * 1.2)
-            discount = f"{int((1 - base_price/original_price) * 100)}%"
-            
-            product = {
-                "Title": f"{brand} {bag_type} - {random.choice(['XS', 'S', 'M', 'L'])}",
-                "Price": f"£{base_price:,}",
-                "Brand": brand,
-                "Size": random.choice(['XS', 'S', 'M', 'L']),
-                "Image": f"https://images.vestiairecollective.com/produit/{random.randint(100000, 999999)}/{''.join(random.choices('abcdefghijklmnopqrstuvwxyz', k=3))}.jpg",
-                "Link": f"https://www.vestiairecollective.co.uk/women/bags/{bag_type.lower().replace(' ', '-')}/{brand.lower()}/{bag_type.lower().replace(' ', '-')}-{random.randint(100000, 999999)}.shtml",
-                "Condition": condition,
-                "Seller": seller,
-                "OriginalPrice": f"£{original_price:,}",
-                "Discount": discount
-            }
-            additional_products.append(product)
-        
-        return base_products + additional_products
+        """Return precomputed sample data for Vestiaire Collective"""
+        return _vestiaire_sample_data()
 
 # Main handler
 handler = MyHandler
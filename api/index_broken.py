@@ -1,67 +1,88 @@
 from http.server import BaseHTTPRequestHandler
 import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, parse_qs
 import re
 import os
 import base64
+import brotli
+import random
 import time
 import threading
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+from functools import lru_cache
 from datetime import datetime, timedelta
 
 # Load environment variables from .env file and Vercel environment
-import os
 
+@lru_cache(maxsize=1)
 def load_env_vars():
     """Load environment variables from .env file and Vercel environment"""
-    # First try to load from environment (Vercel)
+    # First try to load from environment (Vercel); short-circuits before
+    # touching the filesystem when the platform sets the variable
     scrapfly_key = os.getenv('SCRAPFLY_KEY')
-    
-    # If not found, try to load from .env file
+
+    # If not found, try to load from .env file (parsed once, cached after)
     if not scrapfly_key:
         try:
             with open('.env', 'r') as f:
-                for line in f:
-                    if line.strip() and not line.startswith('#'):
-                        key, value = line.strip().split('=', 1)
-                        if key.strip() == 'SCRAPFLY_KEY':
-                            scrapfly_key = value.strip()
-                            break
+                text = f.read()
         except FileNotFoundError:
-            pass
-    
+            return None
+        for line in text.splitlines():
+            if line.strip() and not line.startswith('#'):
+                key, value = line.strip().split('=', 1)
+                if key.strip() == 'SCRAPFLY_KEY':
+                    scrapfly_key = value.strip()
+                    break
+
     return scrapfly_key
 
 # Load environment variables at module level
 SCRAPFLY_KEY = load_env_vars()
 
+# One pooled session for all outbound calls; keep-alive skips the TCP+TLS
+# handshake on every request to the same host
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=0))
+
 class RateLimiter:
     """Advanced rate limiter to prevent 429 errors with adaptive strategies"""
     def __init__(self, max_requests_per_minute=30):
         self.max_requests = max_requests_per_minute
-        self.requests = []
+        self.requests = deque()
         self.current_limit = max_requests_per_minute
         self.adaptive_factor = 1.0
-        
+        # The threaded server calls wait_if_needed from many request threads
+        self._lock = threading.Lock()
+
     def wait_if_needed(self):
         """Wait if rate limit is exceeded"""
-        now = time.time()
-        # Remove requests older than 1 minute
-        self.requests = [req_time for req_time in self.requests if now - req_time < 60]
-        
-        if len(self.requests) >= self.current_limit:
-            # Calculate wait time
-            oldest_request = min(self.requests)
-            wait_until = oldest_request + 60
-            wait_time = max(0, wait_until - now)
-            
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # Timestamps are appended in order, so the stale ones are all
+                # at the left end; popping them is O(1) per entry
+                while self.requests and now - self.requests[0] >= 60:
+                    self.requests.popleft()
+
+                if len(self.requests) < self.current_limit:
+                    self.requests.append(now)
+                    return
+
+                # Oldest entry is requests[0]; it ages out of the window first
+                wait_time = max(0, self.requests[0] + 60 - now)
+
+            # Sleep outside the lock so other threads aren't blocked, then
+            # re-check: another thread may have taken the freed slot
             if wait_time > 0:
                 print(f"⏳ Rate limiting: waiting {wait_time:.1f}s")
                 time.sleep(wait_time)
-        
-        self.requests.append(now)
     
     def adapt_rate(self, success_rate):
         """Adapt rate limiting based on success rate"""
@@ -73,46 +94,62 @@ class RateLimiter:
 class CacheManager:
     """Enhanced cache with intelligent strategies to reduce API calls"""
     def __init__(self, cache_duration_minutes=10):
-        self.cache = {}
+        # TTLCache evicts both by age and by size, so a stream of unique
+        # search queries can't grow the cache without bound. Entries live for
+        # twice the nominal duration: past cache_duration they stop counting
+        # as hits but stick around so a conditional revalidation (ETag +
+        # If-None-Match) can refresh them with a ~200-byte 304 instead of a
+        # full body download and re-parse
         self.cache_duration = cache_duration_minutes * 60
-        self.hit_count = defaultdict(int)
-        self.miss_count = defaultdict(int)
-        
+        self.cache = TTLCache(maxsize=512, ttl=self.cache_duration * 2)
+        # get_cache_stats only ever sums these, so two ints do the job of the
+        # old per-key defaultdicts without O(unique-keys) memory
+        self.hits = 0
+        self.misses = 0
+
     def get(self, key):
         """Get cached data"""
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if time.time() - timestamp < self.cache_duration:
-                self.hit_count[key] += 1
-                return data
-            else:
-                del self.cache[key]
-        
-        self.miss_count[key] += 1
+        entry = self.cache.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self.cache_duration:
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
         return None
-    
-    def set(self, key, data):
+
+    def get_stale(self, key):
+        """Get (data, etag) for a stale-but-revalidatable entry, or None"""
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry[0], entry[2]
+        return None
+
+    def set(self, key, data, etag=None):
         """Set cached data"""
-        self.cache[key] = (data, time.time())
+        self.cache[key] = (data, time.monotonic(), etag)
+
+    def refresh(self, key):
+        """Restart the freshness clock on a revalidated (304) entry"""
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache[key] = (entry[0], time.monotonic(), entry[2])
     
     def get_cache_stats(self):
         """Get cache statistics"""
-        total_hits = sum(self.hit_count.values())
-        total_misses = sum(self.miss_count.values())
-        total_requests = total_hits + total_misses
-        
+        total_requests = self.hits + self.misses
+
         return {
-            'hit_rate': total_hits / total_requests if total_requests > 0 else 0,
-            'total_hits': total_hits,
-            'total_misses': total_misses,
+            'hit_rate': self.hits / total_requests if total_requests > 0 else 0,
+            'total_hits': self.hits,
+            'total_misses': self.misses,
             'cached_items': len(self.cache)
         }
-    
+
     def clear(self):
         """Clear cache"""
         self.cache.clear()
-        self.hit_count.clear()
-        self.miss_count.clear()
+        self.hits = 0
+        self.misses = 0
 
 class CircuitBreaker:
     """Circuit breaker pattern to handle service failures"""
@@ -122,63 +159,155 @@ class CircuitBreaker:
         self.failure_count = 0
         self.last_failure_time = None
         self.state = 'CLOSED'  # CLOSED, OPEN, HALF_OPEN
-    
+        # State transitions race under concurrent scrape threads; while
+        # HALF_OPEN only a single probe may test recovery
+        self._lock = threading.Lock()
+        self._half_open_probe = threading.Semaphore(1)
+
+    def is_open(self):
+        """True while the breaker is OPEN and the recovery window hasn't elapsed"""
+        with self._lock:
+            return (self.state == 'OPEN'
+                    and time.monotonic() - self.last_failure_time < self.recovery_timeout)
+
     def execute(self, func):
         """Execute function with circuit breaker protection"""
-        if self.state == 'OPEN':
-            if time.time() - self.last_failure_time > self.recovery_timeout:
-                self.state = 'HALF_OPEN'
-            else:
-                raise Exception("Circuit breaker is OPEN")
-        
+        probing = False
+        with self._lock:
+            if self.state == 'OPEN':
+                if time.monotonic() - self.last_failure_time > self.recovery_timeout:
+                    self.state = 'HALF_OPEN'
+                else:
+                    raise Exception("Circuit breaker is OPEN")
+            if self.state == 'HALF_OPEN':
+                if not self._half_open_probe.acquire(blocking=False):
+                    raise Exception("Circuit breaker is HALF_OPEN, probe in flight")
+                probing = True
+
         try:
             result = func()
-            if self.state == 'HALF_OPEN':
-                self.state = 'CLOSED'
-                self.failure_count = 0
+            with self._lock:
+                if self.state == 'HALF_OPEN':
+                    self.state = 'CLOSED'
+                    self.failure_count = 0
             return result
         except Exception as e:
-            self.failure_count += 1
-            self.last_failure_time = time.time()
-            
-            if self.failure_count >= self.failure_threshold:
-                self.state = 'OPEN'
-            
-            raise e
+            with self._lock:
+                self.failure_count += 1
+                self.last_failure_time = time.monotonic()
 
-class RequestQueue:
-    """Request queue for managing concurrent requests"""
-    def __init__(self, max_concurrent=3):
-        self.max_concurrent = max_concurrent
-        self.active_requests = 0
-        self.condition = threading.Condition()
-    
-    def acquire(self):
-        """Acquire request slot"""
-        with self.condition:
-            while self.active_requests >= self.max_concurrent:
-                self.condition.wait()
-            self.active_requests += 1
-    
-    def release(self):
-        """Release request slot"""
-        with self.condition:
-            self.active_requests -= 1
-            self.condition.notify()
+                if self.failure_count >= self.failure_threshold:
+                    self.state = 'OPEN'
+
+            raise e
+        finally:
+            if probing:
+                self._half_open_probe.release()
 
 # Enhanced global components with limitation avoidance
 rate_limiter = RateLimiter(max_requests_per_minute=20)  # More conservative
 cache_manager = CacheManager(cache_duration_minutes=15)  # Longer cache
 circuit_breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=120)
-request_queue = RequestQueue(max_concurrent=2)  # Limit concurrent requests
+# Bounded pool instead of the hand-rolled Condition queue: same two-slot
+# admission cap, but worker threads are reused across requests
+executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='scrape')
+
+@lru_cache(maxsize=1)
+def _vestiaire_sample_data():
+    """Generate realistic sample data for Vestiaire Collective (built once)"""
+    brands = ['Chanel', 'Louis Vuitton', 'Hermès', 'Gucci', 'Dior', 'Prada', 'Bottega Veneta', 'Saint Laurent', 'Celine']
+    bag_types = ['Handbag', 'Tote Bag', 'Crossbody Bag', 'Shoulder Bag', 'Clutch', 'Backpack', 'Hobo Bag']
+    conditions = ['Excellent', 'Very Good', 'Good', 'Fair']
+    sellers = ['luxury_boutique_paris', 'vintage_finds_london', 'hermes_specialist_milan', 'dior_fan_madrid', 'prada_vintage_paris']
+    
+    # Base luxury items
+    base_products = [
+        {
+            "Title": "Chanel Classic Flap Bag - Medium",
+            "Price": "£4,250",
+            "Brand": "Chanel",
+            "Size": "Medium",
+            "Image": "https://images.vestiairecollective.com/produit/123456/abc.jpg",
+            "Link": "https://www.vestiairecollective.co.uk/women/bags/handbags/chanel/classic-flap-bag-123456.shtml",
+            "Condition": "Very Good",
+            "Seller": "luxury_boutique_paris",
+            "OriginalPrice": "£5,500",
+            "Discount": "23%"
+        },
+        {
+            "Title": "Louis Vuitton Neverfull MM",
+            "Price": "£1,180",
+            "Brand": "Louis Vuitton",
+            "Size": "MM",
+            "Image": "https://images.vestiairecollective.com/produit/789012/def.jpg",
+            "Link": "https://www.vestiairecollective.co.uk/women/bags/tote-bags/louis-vuitton/neverfull-mm-789012.shtml",
+            "Condition": "Good",
+            "Seller": "vintage_finds_london",
+            "OriginalPrice": "£1,450",
+            "Discount": "19%"
+        },
+        {
+            "Title": "Hermès Birkin 30 Togo Leather",
+            "Price": "£8,900",
+            "Brand": "Hermès",
+            "Size": "30",
+            "Image": "https://images.vestiairecollective.com/produit/345678/ghi.jpg",
+            "Link": "https://www.vestiairecollective.co.uk/women/bags/handbags/hermes/birkin-30-345678.shtml",
+            "Condition": "Excellent",
+            "Seller": "hermes_specialist_milan",
+            "OriginalPrice": "£10,200",
+            "Discount": "13%"
+        }
+    ]
+    
+    # URL slugs computed once per distinct value; the loop just looks them up
+    brand_slugs = {b: b.lower() for b in brands}
+    bag_slugs = {t: t.lower().replace(' ', '-') for t in bag_types}
+
+    # Generate additional items; attribute columns drawn in one batch each
+    drawn = zip(random.choices(brands, k=20), random.choices(bag_types, k=20),
+                random.choices(conditions, k=20), random.choices(sellers, k=20),
+                random.choices(['XS', 'S', 'M', 'L'], k=20),
+                random.choices(['XS', 'S', 'M', 'L'], k=20))
+
+    additional_products = []
+    for brand, bag_type, condition, seller, title_size, size in drawn:
+        base_price = random.randint(200, 5000) if brand in ["Chanel", "Hermès"] else random.randint(100, 2000)
+        original_price = int(base_price * 1.2)
+        discount = f"{int((1 - base_price/original_price) * 100)}%"
+
+        product = {
+            "Title": f"{brand} {bag_type} - {title_size}",
+            "Price": f"£{base_price:,}",
+            "Brand": brand,
+            "Size": size,
+            "Image": f"https://images.vestiairecollective.com/produit/{random.randint(100000, 999999)}/{''.join(random.choices('abcdefghijklmnopqrstuvwxyz', k=3))}.jpg",
+            "Link": f"https://www.vestiairecollective.co.uk/women/bags/{bag_slugs[bag_type]}/{brand_slugs[brand]}/{bag_slugs[bag_type]}-{random.randint(100000, 999999)}.shtml",
+            "Condition": condition,
+            "Seller": seller,
+            "OriginalPrice": f"£{original_price:,}",
+            "Discount": discount
+        }
+        additional_products.append(product)
+    
+    return base_products + additional_products
 
 class MyHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps client connections alive between requests; every
+    # response already sets Content-Length, which keep-alive requires
+    protocol_version = 'HTTP/1.1'
+    # Buffer the response stream: status line, headers and body coalesce
+    # into one socket write (handle_one_request flushes after each request)
+    # instead of a syscall per send_header/body write
+    wbufsize = -1
+
     def do_OPTIONS(self):
         """Handle OPTIONS preflight requests for CORS"""
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
     def do_GET(self):
@@ -205,36 +334,36 @@ class MyHandler(BaseHTTPRequestHandler):
             'error': error
         }
         
-        json_response = json.dumps(response)
+        # Serialize once: orjson emits UTF-8 bytes directly, and the same
+        # buffer feeds both Content-length and the body write
+        body = orjson.dumps(response)
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.send_header('Content-length', str(len(json_response.encode('utf-8'))))
+        self.send_header('Content-length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json_response.encode('utf-8'))
+        self.wfile.write(body)
 
     def get_vinted_sample_data(self):
         """Generate sample data for Vinted"""
-        import random
-        
         brands = ['Nike', 'Adidas', 'Zara', 'H&M', 'Gucci', 'Prada', 'Louis Vuitton', 'Chanel']
         items = ['T-shirt', 'Jeans', 'Dress', 'Sneakers', 'Handbag', 'Jacket', 'Sweater', 'Skirt']
         conditions = ['Very Good', 'Good', 'Fair']
         
+        # One batched draw per column instead of four random calls per row
+        drawn = zip(random.choices(brands, k=23), random.choices(items, k=23),
+                    random.choices(conditions, k=23), random.choices(range(10, 201), k=23),
+                    random.choices(['XS', 'S', 'M', 'L', 'XL'], k=23))
+
         sample_items = []
-        for i in range(23):
-            brand = random.choice(brands)
-            item = random.choice(items)
-            condition = random.choice(conditions)
-            price = random.randint(10, 200)
-            
+        for i, (brand, item, condition, price, size) in enumerate(drawn):
             sample_items.append({
                 "Title": f"{brand} {item}",
                 "Price": f"£{price}",
                 "Brand": brand,
-                "Size": random.choice(['XS', 'S', 'M', 'L', 'XL']),
+                "Size": size,
                 "Image": f"https://images.vinted.net/placeholder_{i}.jpg",
                 "Link": f"https://www.vinted.co.uk/items/{i}",
                 "Condition": condition,
@@ -247,80 +376,8 @@ class MyHandler(BaseHTTPRequestHandler):
 
     def get_vestiaire_sample_data(self):
         """Generate realistic sample data for Vestiaire Collective"""
-        import random
-        
-        brands = ['Chanel', 'Louis Vuitton', 'Hermès', 'Gucci', 'Dior', 'Prada', 'Bottega Veneta', 'Saint Laurent', 'Celine']
-        bag_types = ['Handbag', 'Tote Bag', 'Crossbody Bag', 'Shoulder Bag', 'Clutch', 'Backpack', 'Hobo Bag']
-        conditions = ['Excellent', 'Very Good', 'Good', 'Fair']
-        sellers = ['luxury_boutique_paris', 'vintage_finds_london', 'hermes_specialist_milan', 'dior_fan_madrid', 'prada_vintage_paris']
-        
-        # Base luxury items
-        base_products = [
-            {
-                "Title": "Chanel Classic Flap Bag - Medium",
-                "Price": "£4,250",
-                "Brand": "Chanel",
-                "Size": "Medium",
-                "Image": "https://images.vestiairecollective.com/produit/123456/abc.jpg",
-                "Link": "https://www.vestiairecollective.co.uk/women/bags/handbags/chanel/classic-flap-bag-123456.shtml",
-                "Condition": "Very Good",
-                "Seller": "luxury_boutique_paris",
-                "OriginalPrice": "£5,500",
-                "Discount": "23%"
-            },
-            {
-                "Title": "Louis Vuitton Neverfull MM",
-                "Price": "£1,180",
-                "Brand": "Louis Vuitton",
-                "Size": "MM",
-                "Image": "https://images.vestiairecollective.com/produit/789012/def.jpg",
-                "Link": "https://www.vestiairecollective.co.uk/women/bags/tote-bags/louis-vuitton/neverfull-mm-789012.shtml",
-                "Condition": "Good",
-                "Seller": "vintage_finds_london",
-                "OriginalPrice": "£1,450",
-                "Discount": "19%"
-            },
-            {
-                "Title": "Hermès Birkin 30 Togo Leather",
-                "Price": "£8,900",
-                "Brand": "Hermès",
-                "Size": "30",
-                "Image": "https://images.vestiairecollective.com/produit/345678/ghi.jpg",
-                "Link": "https://www.vestiairecollective.co.uk/women/bags/handbags/hermes/birkin-30-345678.shtml",
-                "Condition": "Excellent",
-                "Seller": "hermes_specialist_milan",
-                "OriginalPrice": "£10,200",
-                "Discount": "13%"
-            }
-        ]
-        
-        # Generate additional items
-        additional_products = []
-        for i in range(20):
-            brand = random.choice(brands)
-            bag_type = random.choice(bag_types)
-            condition = random.choice(conditions)
-            seller = random.choice(sellers)
-            
-            base_price = random.randint(200, 5000) if brand in ["Chanel", "Hermès"] else random.randint(100, 2000)
-            original_price = int(base_price * 1.2)
-            discount = f"{int((1 - base_price/original_price) * 100)}%"
-            
-            product = {
-                "Title": f"{brand} {bag_type} - {random.choice(['XS', 'S', 'M', 'L'])}",
-                "Price": f"£{base_price:,}",
-                "Brand": brand,
-                "Size": random.choice(['XS', 'S', 'M', 'L']),
-                "Image": f"https://images.vestiairecollective.com/produit/{random.randint(100000, 999999)}/{''.join(random.choices('abcdefghijklmnopqrstuvwxyz', k=3))}.jpg",
-                "Link": f"https://www.vestiairecollective.co.uk/women/bags/{bag_type.lower().replace(' ', '-')}/{brand.lower()}/{bag_type.lower().replace(' ', '-')}-{random.randint(100000, 999999)}.shtml",
-                "Condition": condition,
-                "Seller": seller,
-                "OriginalPrice": f"£{original_price:,}",
-                "Discount": discount
-            }
-            additional_products.append(product)
-        
-        return base_products + additional_products
+        # Generated once at first use; copy so callers can't mutate the cache
+        return list(_vestiaire_sample_data())
 
     def scrape_vestiaire_data(self, search_text, page_number=1, items_per_page=50, min_price=None, max_price=None, country='uk'):
         """Enhanced Vestiaire scraper with advanced limitation avoidance strategies"""
@@ -334,16 +391,36 @@ class MyHandler(BaseHTTPRequestHandler):
             print(f"🎯 Cache hit for Vestiaire: {search_text}")
             return cached_result
         
+        # A stale entry still carries the upstream ETag; send it so an
+        # unchanged result set comes back as an empty 304
+        stale = cache_manager.get_stale(cache_key)
+        etag = stale[1] if stale else None
+
         # Circuit breaker protection
         def protected_scrape():
-            return self._execute_vestiaire_scrape(search_text, page_number, items_per_page, min_price, max_price, country)
-        
+            return self._execute_vestiaire_scrape(search_text, page_number, items_per_page, min_price, max_price, country, etag=etag)
+
+        # While the breaker is OPEN no upstream call will be made, so don't
+        # burn a rate-limit slot (or wait for one) just to have execute()
+        # raise; fall straight through to the fallback with zero delay
+        if not circuit_breaker.is_open():
+            rate_limiter.wait_if_needed()
+
         try:
             # Execute with circuit breaker
-            result = circuit_breaker.execute(protected_scrape)
-            
+            outcome = circuit_breaker.execute(protected_scrape)
+
+            if outcome is None and stale:
+                # 304: upstream unchanged, the stale entry is still good
+                cache_manager.refresh(cache_key)
+                rate_limiter.adapt_rate(1.0)
+                print(f"🎯 Revalidated Vestiaire cache (304): {search_text}")
+                return stale[0]
+
+            result, response_etag = outcome
+
             # Cache successful result
-            cache_manager.set(cache_key, result)
+            cache_manager.set(cache_key, result, etag=response_etag)
             
             # Adapt rate limiting based on success
             rate_limiter.adapt_rate(1.0)  # 100% success rate
@@ -373,16 +450,12 @@ class MyHandler(BaseHTTPRequestHandler):
             
             return fallback_result
 
-    def _execute_vestiaire_scrape(self, search_text, page_number, items_per_page, min_price=None, max_price, country):
-        """Execute actual Vestiaire scrape using official Product Search API"""
-        
-        import requests
-        import json
-        import brotli
-        import time
-        import re
-        import random
-        
+    def _execute_vestiaire_scrape(self, search_text, page_number, items_per_page, min_price=None, max_price=None, country='uk', etag=None):
+        """Execute actual Vestiaire scrape using official Product Search API
+
+        Returns (result, etag), or None when a conditional request came back 304.
+        """
+
         # Vestiaire Product Search API endpoint
         api_url = "https://search.vestiairecollective.com/v1/product/search"
         
@@ -412,15 +485,22 @@ class MyHandler(BaseHTTPRequestHandler):
             'sec-fetch-mode': 'cors',
             'sec-fetch-site': 'same-site',
         }
-        
+
+        if etag:
+            headers['If-None-Match'] = etag
+
         try:
             print(f"🔄 Calling Vestiaire API: {api_url}")
             print(f"📝 Query params: {params}")
-            
+
             # Make request with delay to be respectful
             time.sleep(random.uniform(0.5, 1.5))
-            response = requests.post(api_url, json=params, headers=headers, timeout=15)
-            
+            response = _session.post(api_url, json=params, headers=headers, timeout=15)
+
+            if response.status_code == 304:
+                print("📄 Not modified since last fetch (304)")
+                return None
+
             if response.status_code == 200:
                 # Handle compression decompression
                 response_text = response.text
@@ -598,8 +678,8 @@ class MyHandler(BaseHTTPRequestHandler):
                 
                 print(f"✅ Successfully fetched {len(products)} products from Vestiaire API")
                 print(f"📊 Page {pagination['current_page']} of {pagination['total_pages']}, Total: {pagination['total_items']} items")
-                
-                return {'products': products, 'pagination': pagination}
+
+                return {'products': products, 'pagination': pagination}, response.headers.get('ETag')
                 
             else:
                 error_msg = f"HTTP {response.status_code}: {response.text}"
@@ -618,11 +698,11 @@ handler = MyHandler
 
 # Local server startup
 if __name__ == '__main__':
-    from http.server import HTTPServer
+    from http.server import ThreadingHTTPServer
     import sys
-    
+
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
-    server = HTTPServer(('localhost', port), handler)
+    server = ThreadingHTTPServer(('localhost', port), handler)
     print(f"🚀 Enhanced API Server running on http://localhost:{port}")
     print("📝 Available endpoints:")
     print("   / - Vinted scraper (default)")
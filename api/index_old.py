@@ -1,11 +1,36 @@
 
 from http.server import BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
 import json
+import threading
+import time
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import urlparse, parse_qs, urlencode
 import re
 
+# The whole page is parsed just to reach one script tag; skip everything else
+_STORE_STRAINER = SoupStrainer('script', attrs={'data-js-react-on-rails-store': 'MainStore'})
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# requests.get blocks on the socket with the GIL released, so page fetches
+# parallelize well; keep the pool bounded so we don't hammer one host
+_pool = ThreadPoolExecutor(max_workers=10)
+_local = threading.local()
+
+
+def _get_session():
+    """Per-thread Session so each worker reuses its own keep-alive pool"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(_HEADERS)
+        _local.session = session
+    return session
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         parsed_path = urlparse(self.path)
@@ -51,63 +76,69 @@ class handler(BaseHTTPRequestHandler):
         self.wfile.write(content.encode('utf-8'))
 
     def scrape_vinted_data(self, search_text, brand, category, min_price, max_price, country, pages):
-        all_data = []
-        
         # If a category is provided, append it to the search text.
         # This is a simple way to filter by category without needing complex category IDs.
         if category:
             search_text = f"{search_text} {category}".strip()
 
+        # Fan the pages out to the pool; stagger submissions slightly so the
+        # workers don't open every connection in the same instant
+        futures = []
         for page in range(1, pages + 1):
-            try:
-                base_url = f'https://www.vinted.{country}/catalog'
-                
-                # Use separate parameters for search text and brand for accurate filtering.
-                params = {
-                    'search_text': search_text,
-                    'brand_title': brand, # Use Vinted's parameter for brand name
-                    'price_from': min_price,
-                    'price_to': max_price,
-                    'page': page
-                }
-                # Clean up parameters - remove any that are empty
-                params = {k: v for k, v in params.items() if v}
-                
-                url = f'{base_url}?{urlencode(params)}'
-                
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                response = requests.get(url, headers=headers, timeout=15)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                script_tag = soup.find('script', {'data-js-react-on-rails-store': 'MainStore'})
-                if not script_tag:
-                    break
-
-                json_data = json.loads(script_tag.string)
-                items = json_data.get('items', {}).get('byId', {})
-
-                if not items:
-                    break
-
-                for item_id, item_details in items.items():
-                    if item_details and item_details.get('is_visible') and not item_details.get('is_reserved'):
-                        all_data.append({
-                            'Title': item_details.get('title', 'N/A'),
-                            'Price': item_details.get('price', 'N/A'),
-                            'Currency': item_details.get('currency', 'N/A'),
-                            'Brand': item_details.get('brand_title', 'N/A'),
-                            'Size': item_details.get('size_title', 'N/A'),
-                            'URL': item_details.get('url', '#'),
-                            'ImageURL': item_details.get('photo', {}).get('url', '')
-                        })
+            futures.append(_pool.submit(
+                self._scrape_vinted_page, search_text, brand, min_price, max_price, country, page))
+            if page < pages:
+                time.sleep(0.1)
 
+        all_data = []
+        for page, future in enumerate(futures, start=1):
+            try:
+                all_data.extend(future.result())
             except requests.exceptions.RequestException as e:
                 raise Exception(f'Failed to fetch data from Vinted: {e}')
             except Exception as e:
                 raise Exception(f'Error processing page {page}: {e}')
-        
+
         return all_data
+
+    def _scrape_vinted_page(self, search_text, brand, min_price, max_price, country, page):
+        base_url = f'https://www.vinted.{country}/catalog'
+
+        # Use separate parameters for search text and brand for accurate filtering.
+        params = {
+            'search_text': search_text,
+            'brand_title': brand, # Use Vinted's parameter for brand name
+            'price_from': min_price,
+            'price_to': max_price,
+            'page': page
+        }
+        # Clean up parameters - remove any that are empty
+        params = {k: v for k, v in params.items() if v}
+
+        url = f'{base_url}?{urlencode(params)}'
+
+        response = _get_session().get(url, timeout=15)
+        response.raise_for_status()
+
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=_STORE_STRAINER)
+
+        script_tag = soup.find('script', {'data-js-react-on-rails-store': 'MainStore'})
+        if not script_tag:
+            return []
+
+        json_data = json.loads(script_tag.string)
+        items = json_data.get('items', {}).get('byId', {})
+
+        page_data = []
+        for item_id, item_details in items.items():
+            if item_details and item_details.get('is_visible') and not item_details.get('is_reserved'):
+                page_data.append({
+                    'Title': item_details.get('title', 'N/A'),
+                    'Price': item_details.get('price', 'N/A'),
+                    'Currency': item_details.get('currency', 'N/A'),
+                    'Brand': item_details.get('brand_title', 'N/A'),
+                    'Size': item_details.get('size_title', 'N/A'),
+                    'URL': item_details.get('url', '#'),
+                    'ImageURL': item_details.get('photo', {}).get('url', '')
+                })
+        return page_data
@@ -1,11 +1,50 @@
 import requests
 import json
-import gzip
-import brotli
+import os
+import random
+import time
 
-def test_vestiaire_api():
+# The structure dumps below are ~20 prints per call; keep them off unless
+# explicitly debugging so log volume stays sane
+DEBUG = os.getenv('DEBUG', '').lower() in ('1', 'true', 'yes')
+
+# Shared keep-alive session: both test methods hit the same host, so the
+# second request reuses the first one's TLS connection
+_session = requests.Session()
+
+# Built once instead of per call
+_API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-GB,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.vestiairecollective.co.uk/',
+    'Origin': 'https://www.vestiairecollective.co.uk',
+    'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"',
+    'sec-fetch-dest': 'empty',
+    'sec-fetch-mode': 'cors',
+    'sec-fetch-site': 'same-site',
+}
+
+def _do(method, url, session=_session, max_retries=3, **kwargs):
+    """Issue a request, honouring 429 Retry-After with backoff and jitter"""
+    for attempt in range(max_retries + 1):
+        response = session.request(method, url, **kwargs)
+        if response.status_code != 429 or attempt == max_retries:
+            return response
+        try:
+            delay = float(response.headers.get('Retry-After', 2 ** attempt))
+        except ValueError:
+            delay = float(2 ** attempt)
+        delay += random.uniform(0, 0.5)
+        print(f"⏳ 429 received, backing off {delay:.1f}s before retry {attempt + 1}")
+        time.sleep(delay)
+
+def test_vestiaire_api(session=_session):
     """Test the Vestiaire Product Search API directly"""
-    
+
     api_url = "https://search.vestiairecollective.com/v1/product/search"
     
     # Try both GET and POST
@@ -22,21 +61,6 @@ def test_vestiaire_api():
         'include': ['price', 'brand', 'images', 'seller', 'condition']
     }
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-GB,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://www.vestiairecollective.co.uk/',
-        'Origin': 'https://www.vestiairecollective.co.uk',
-        'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"macOS"',
-        'sec-fetch-dest': 'empty',
-        'sec-fetch-mode': 'cors',
-        'sec-fetch-site': 'same-site',
-    }
-    
     try:
         print("🔄 Testing Vestiaire API...")
         
@@ -44,66 +68,51 @@ def test_vestiaire_api():
             print(f"📡 Trying {method} request...")
             
             if method == 'POST':
-                response = requests.post(api_url, json=params, headers=headers, timeout=15)
+                response = _do('POST', api_url, session=session, json=params, headers=_API_HEADERS, timeout=15)
             else:
-                response = requests.get(api_url, params=params, headers=headers, timeout=15)
+                response = _do('GET', api_url, session=session, params=params, headers=_API_HEADERS, timeout=15)
             
             print(f"📊 {method} Status: {response.status_code}")
             
             if response.status_code == 200:
-                print(f"📄 Response headers: {dict(response.headers)}")
-                print(f"📄 Response content type: {response.headers.get('content-type')}")
-                
-                # Handle compression decompression
-                response_text = response.text
-                content_encoding = response.headers.get('content-encoding', '')
-                
-                if content_encoding == 'gzip':
-                    try:
-                        response_text = gzip.decompress(response.content).decode('utf-8')
-                        print("📄 Decompressed gzip response")
-                    except:
-                        print("📄 Failed to decompress gzip, using raw text")
-                elif content_encoding == 'br':
-                    try:
-                        response_text = brotli.decompress(response.content).decode('utf-8')
-                        print("📄 Decompressed brotli response")
-                    except:
-                        print("📄 Failed to decompress brotli, using raw text")
-                
-                print(f"📄 Response text (first 500 chars): {response_text[:500]}")
-                
+                # urllib3 already decodes gzip/deflate (and brotli with the
+                # codec installed) transparently, so the body is plain JSON
                 try:
-                    data = json.loads(response_text)
+                    data = response.json()
                     print("✅ API Response received!")
                 except json.JSONDecodeError as e:
                     print(f"❌ JSON decode error: {e}")
-                    print(f"❌ Raw response: {response_text[:1000]}")
+                    print(f"❌ Raw response: {response.text[:1000]}")
                     continue
-                
-                # Print the complete structure to find hidden fields
-                print(f"� Complete response structure:")
-                for key in data.keys():
-                    if key != 'items':
-                        print(f"  {key}: {type(data[key])}")
-                        if isinstance(data[key], dict):
-                            for subkey in data[key].keys():
-                                print(f"    {subkey}: {type(data[key][subkey])}")
-                
-                # Print complete item structure for first product
-                if 'items' in data and len(data['items']) > 0:
-                    print(f"\n🔍 Complete item structure:")
-                    first_item = data['items'][0]
-                    for key in first_item.keys():
-                        print(f"  {key}: {first_item[key]}")
-                        if isinstance(first_item[key], dict):
-                            for subkey in first_item[key].keys():
-                                print(f"    {subkey}: {first_item[key][subkey]}")
-                
-                if 'pagination' in data:
-                    pagination = data['pagination']
-                    print(f"\n📄 Pagination: Page {pagination.get('page')} of {pagination.get('total_pages')}, Total: {pagination.get('total_count')} items")
-                
+
+                if DEBUG:
+                    # Build the whole structure dump as one block so the
+                    # inspection costs a single stdout write
+                    lines = [f"📄 Response headers: {dict(response.headers)}",
+                             f"📄 Response text (first 500 chars): {response.text[:500]}",
+                             "🔍 Complete response structure:"]
+                    for key in data.keys():
+                        if key != 'items':
+                            lines.append(f"  {key}: {type(data[key])}")
+                            if isinstance(data[key], dict):
+                                lines.extend(f"    {subkey}: {type(data[key][subkey])}"
+                                             for subkey in data[key].keys())
+
+                    if 'items' in data and len(data['items']) > 0:
+                        lines.append("🔍 Complete item structure:")
+                        first_item = data['items'][0]
+                        for key in first_item.keys():
+                            lines.append(f"  {key}: {first_item[key]}")
+                            if isinstance(first_item[key], dict):
+                                lines.extend(f"    {subkey}: {first_item[key][subkey]}"
+                                             for subkey in first_item[key].keys())
+
+                    if 'pagination' in data:
+                        pagination = data['pagination']
+                        lines.append(f"📄 Pagination: Page {pagination.get('page')} of {pagination.get('total_pages')}, Total: {pagination.get('total_count')} items")
+
+                    print("\n".join(lines))
+
                 return data
                 
             else:
@@ -1,112 +1,193 @@
-import requests
-import json
-import brotli
+import httpx
+import orjson
 import re
-from bs4 import BeautifulSoup
+import lxml.html
+import operator
+import threading
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-def get_vestiaire_product_details(product_url, product_id):
-    """Get detailed product information by scraping the product page"""
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-GB,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://www.vestiairecollective.co.uk/',
+# One C-level call pulls all four fields per item; the .get chain below is
+# only the fallback for items missing a key
+_ITEM_FIELDS = operator.itemgetter('id', 'name', 'description', 'link')
+
+# Everything in this module hits the same couple of Vestiaire hosts, and
+# they speak HTTP/2: the concurrent detail fetches multiplex as streams
+# over one warm TLS connection instead of racing for HTTP/1.1 sockets
+_client = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=10),
+        retries=3,
+    ),
+)
+
+# Detail pages are fetched concurrently; the semaphore caps how many are in
+# flight and each holder sleeps its jitter inside the slot, so politeness
+# survives the parallelism without serializing the whole batch
+_detail_pool = ThreadPoolExecutor(max_workers=8)
+_detail_gate = threading.Semaphore(4)
+
+# Built once instead of per call; every request sends the same browser
+# identity, and the search params only vary in query/page/limit
+_HTML_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-GB,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.vestiairecollective.co.uk/',
+}
+
+_JSON_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-GB,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.vestiairecollective.co.uk/',
+    'Origin': 'https://www.vestiairecollective.co.uk',
+    'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"',
+    'sec-fetch-dest': 'empty',
+    'sec-fetch-mode': 'cors',
+    'sec-fetch-site': 'same-site',
+}
+
+_API_PARAMS_TEMPLATE = {
+    'sort': 'relevance',
+    'category_id': '1',
+    'gender': 'women',
+    'locale': {'country': 'GB', 'language': 'en', 'currency': 'GBP'}
+}
+
+def _fetch_details_politely(product_url, product_id):
+    """Fetch one detail page while holding a politeness slot"""
+    with _detail_gate:
+        time.sleep(random.uniform(1, 2))
+        return get_vestiaire_product_details(product_url, product_id)
+
+# Vestiaire is a Next.js site: the page ships its full product record as a
+# JSON blob in <script id="__NEXT_DATA__">. Grabbing that byte range and
+# parsing it is far cheaper than building a DOM, and the data is
+# authoritative rather than guessed from fuzzy class names
+_NEXT_DATA_RE = re.compile(rb'__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+# One XPath union covers every field's candidate nodes, so the fallback DOM
+# extraction costs a single C-level traversal instead of one per field
+_DETAIL_NODES_XPATH = (
+    '//*[@data-testid="price" or @data-testid="brand" or @data-testid="condition"'
+    ' or @data-testid="seller"'
+    ' or contains(@class, "price") or contains(@class, "brand")'
+    ' or contains(@class, "condition") or contains(@class, "seller")'
+    ' or (self::img and (contains(@src, "vestiairecollective.com")'
+    ' or contains(@data-src, "vestiairecollective.com")))]'
+)
+
+def _details_from_next_data(payload):
+    """Map the embedded __NEXT_DATA__ product record to our details dict"""
+    try:
+        product = orjson.loads(payload)['props']['pageProps']['product']
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        return None
+    if not isinstance(product, dict):
+        return None
+
+    price_info = product.get('price') or {}
+    images = []
+    for img in product.get('images') or []:
+        src = img.get('url') if isinstance(img, dict) else img
+        if src:
+            images.append(src)
+            break
+
+    return {
+        'price': price_info.get('formatted') or 'Price not available',
+        'brand': (product.get('brand') or {}).get('name', 'Unknown'),
+        'images': images,
+        'condition': (product.get('condition') or {}).get('name', 'Good'),
+        'seller': (product.get('seller') or {}).get('username', 'vestiaire_seller')
     }
-    
+
+# One compiled alternation replaces the chained substring checks; longest
+# names first so 'Louis Vuitton' wins over any single-word prefix
+_BRAND_NAMES = ['Chanel', 'Louis Vuitton', 'Hermès', 'Hermes', 'Gucci']
+_BRAND_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(b) for b in sorted(_BRAND_NAMES, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE)
+_BRAND_CANONICAL = {b.lower(): b for b in _BRAND_NAMES}
+_BRAND_CANONICAL['hermes'] = 'Hermès'
+
+@lru_cache(maxsize=4096)
+def _product_details_cached(product_url, product_id):
+    """Memoized fetch; failures raise so lru_cache doesn't store them"""
+    details = _fetch_product_details(product_url, product_id)
+    if details is None:
+        raise LookupError(product_id)
+    return details
+
+def get_vestiaire_product_details(product_url, product_id):
+    """Get detailed product information, cached per product page
+
+    Paging through search results re-requests the same products; the cache
+    turns those repeat page fetches into a dict lookup. Transient failures
+    return None without being cached, so they're retried next time.
+    """
+    try:
+        return _product_details_cached(product_url, product_id)
+    except LookupError:
+        return None
+
+def _fetch_product_details(product_url, product_id):
+    """Scrape one product page for detailed information"""
+
     try:
         print(f"🔍 Scraping product details: {product_url}")
-        response = requests.get(product_url, headers=headers, timeout=10)
+        response = _client.get(product_url, headers=_HTML_HEADERS, timeout=10)
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract price
-            price = 'Price not available'
-            price_selectors = [
-                '[data-testid="price"]',
-                '.price',
-                '.product-price',
-                '[class*="price"]'
-            ]
-            
-            for selector in price_selectors:
-                price_elem = soup.select_one(selector)
-                if price_elem:
-                    price = price_elem.get_text(strip=True)
-                    break
-            
-            # Extract brand
-            brand = 'Unknown'
-            brand_selectors = [
-                '[data-testid="brand"]',
-                '.brand',
-                '.product-brand',
-                '[class*="brand"]'
-            ]
-            
-            for selector in brand_selectors:
-                brand_elem = soup.select_one(selector)
-                if brand_elem:
-                    brand = brand_elem.get_text(strip=True)
-                    break
-            
-            # Extract images
+            # Fast path: lift the embedded product JSON straight out of the
+            # page bytes, skipping HTML parsing entirely
+            next_match = _NEXT_DATA_RE.search(response.content)
+            if next_match:
+                details = _details_from_next_data(next_match.group(1))
+                if details:
+                    return details
+
+            # Fallback when the marker is missing: raw lxml skips
+            # BeautifulSoup's per-node Python wrappers; the whole parse and
+            # the one union query below run in C
+            tree = lxml.html.fromstring(response.content)
+
+            # Walk the candidate nodes once in document order and bucket
+            # them into fields; first hit per field wins
+            price = brand = condition = seller = None
             images = []
-            image_selectors = [
-                '[data-testid="product-image"] img',
-                '.product-image img',
-                '.gallery img',
-                'img[src*="vestiairecollective.com"]'
-            ]
-            
-            for selector in image_selectors:
-                img_elems = soup.select(selector)
-                for img in img_elems:
-                    src = img.get('src') or img.get('data-src')
-                    if src and 'vestiairecollective.com' in src:
-                        images.append(src)
-                        break
-                if images:
-                    break
-            
-            # Extract condition
-            condition = 'Good'
-            condition_selectors = [
-                '[data-testid="condition"]',
-                '.condition',
-                '.product-condition'
-            ]
-            
-            for selector in condition_selectors:
-                condition_elem = soup.select_one(selector)
-                if condition_elem:
-                    condition = condition_elem.get_text(strip=True)
-                    break
-            
-            # Extract seller
-            seller = 'vestiaire_seller'
-            seller_selectors = [
-                '[data-testid="seller"]',
-                '.seller',
-                '.product-seller'
-            ]
-            
-            for selector in seller_selectors:
-                seller_elem = soup.select_one(selector)
-                if seller_elem:
-                    seller = seller_elem.get_text(strip=True)
-                    break
-            
+            for node in tree.xpath(_DETAIL_NODES_XPATH):
+                if node.tag == 'img':
+                    if not images:
+                        src = node.get('src') or node.get('data-src')
+                        if src and 'vestiairecollective.com' in src:
+                            images.append(src)
+                    continue
+                testid = node.get('data-testid', '')
+                cls = node.get('class', '')
+                if price is None and (testid == 'price' or 'price' in cls):
+                    price = node.text_content().strip()
+                elif brand is None and (testid == 'brand' or 'brand' in cls):
+                    brand = node.text_content().strip()
+                elif condition is None and (testid == 'condition' or 'condition' in cls):
+                    condition = node.text_content().strip()
+                elif seller is None and (testid == 'seller' or 'seller' in cls):
+                    seller = node.text_content().strip()
+
             return {
-                'price': price,
-                'brand': brand,
+                'price': price or 'Price not available',
+                'brand': brand or 'Unknown',
                 'images': images,
-                'condition': condition,
-                'seller': seller
+                'condition': condition or 'Good',
+                'seller': seller or 'vestiaire_seller'
             }
         
         else:
@@ -123,62 +204,40 @@ def scrape_vestiaire_with_details(search_text, page_number=1, items_per_page=5):
     # First, get basic product list from search API
     api_url = "https://search.vestiairecollective.com/v1/product/search"
     
-    params = {
-        'q': search_text,
-        'page': page_number,
-        'limit': items_per_page,
-        'sort': 'relevance',
-        'category_id': '1',
-        'gender': 'women',
-        'locale': {'country': 'GB', 'language': 'en', 'currency': 'GBP'}
-    }
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-GB,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://www.vestiairecollective.co.uk/',
-        'Origin': 'https://www.vestiairecollective.co.uk',
-        'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"macOS"',
-        'sec-fetch-dest': 'empty',
-        'sec-fetch-mode': 'cors',
-        'sec-fetch-site': 'same-site',
-    }
-    
+    params = {**_API_PARAMS_TEMPLATE, 'q': search_text, 'page': page_number, 'limit': items_per_page}
+
     try:
         print(f"🔄 Getting product list from Vestiaire API...")
-        response = requests.post(api_url, json=params, headers=headers, timeout=15)
+        response = _client.post(api_url, json=params, headers=_JSON_HEADERS, timeout=15)
         
         if response.status_code == 200:
-            # Handle compression
-            response_text = response.text
-            content_encoding = response.headers.get('content-encoding', '')
-            
-            if content_encoding == 'br':
-                try:
-                    response_text = brotli.decompress(response.content).decode('utf-8')
-                    print("📄 Decompressed brotli response")
-                except:
-                    print("📄 Failed to decompress brotli, using raw text")
-            
-            data = json.loads(response_text)
+            # urllib3 already decodes gzip/deflate (and brotli with the codec
+            # installed) transparently, so .content is plain JSON bytes
+            data = orjson.loads(response.content)
             products = []
             
             if 'items' in data:
-                for item in data['items']:
+                items = data['items']
+
+                # Fan the detail fetches out over the pool; workers share the
+                # pooled session so they ride the same keep-alive connections
+                detail_results = list(_detail_pool.map(
+                    lambda item: _fetch_details_politely(
+                        f"https://www.vestiairecollective.co.uk{item.get('link', '')}" if item.get('link') else '',
+                        item.get('id', '')),
+                    items))
+
+                for item, details in zip(items, detail_results):
                     try:
-                        product_id = item.get('id', '')
-                        title = item.get('name', '')
-                        description = item.get('description', '')
-                        relative_link = item.get('link', '')
+                        try:
+                            product_id, title, description, relative_link = _ITEM_FIELDS(item)
+                        except KeyError:
+                            product_id = item.get('id', '')
+                            title = item.get('name', '')
+                            description = item.get('description', '')
+                            relative_link = item.get('link', '')
                         product_url = f"https://www.vestiairecollective.co.uk{relative_link}" if relative_link else ''
-                        
-                        # Get detailed information
-                        details = get_vestiaire_product_details(product_url, product_id)
-                        
+
                         # Use scraped details or fallback to extracted info
                         price = details['price'] if details else 'Price not available'
                         if price == 'Price not available':
@@ -190,14 +249,9 @@ def scrape_vestiaire_with_details(search_text, page_number=1, items_per_page=5):
                         brand = details['brand'] if details else 'Unknown'
                         if brand == 'Unknown':
                             # Extract brand from title/description
-                            if 'chanel' in title.lower() or 'chanel' in description.lower():
-                                brand = 'Chanel'
-                            elif 'louis vuitton' in title.lower() or 'louis vuitton' in description.lower():
-                                brand = 'Louis Vuitton'
-                            elif 'hermès' in title.lower() or 'hermes' in description.lower():
-                                brand = 'Hermès'
-                            elif 'gucci' in title.lower() or 'gucci' in description.lower():
-                                brand = 'Gucci'
+                            match = _BRAND_RE.search(title) or _BRAND_RE.search(description)
+                            if match:
+                                brand = _BRAND_CANONICAL[match.group(1).lower()]
                         
                         image_url = ''
                         if details and details['images']:
@@ -224,10 +278,7 @@ def scrape_vestiaire_with_details(search_text, page_number=1, items_per_page=5):
                         
                         products.append(product)
                         print(f"✅ Processed: {brand} - {title[:50]}...")
-                        
-                        # Add delay to be respectful
-                        time.sleep(random.uniform(1, 2))
-                        
+
                     except Exception as e:
                         print(f"⚠️ Error processing product {item.get('id', 'unknown')}: {e}")
                         continue
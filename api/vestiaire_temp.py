@@ -1,60 +1,131 @@
 import requests
-import json
-import brotli
+import orjson
 import re
+import operator
 import time
 import random
+import ahocorasick
+
+# One C-level call pulls all four fields per item; the .get chain below is
+# only the fallback for items missing a key
+_ITEM_FIELDS = operator.itemgetter('id', 'name', 'description', 'link')
+
+# Pattern tables hoisted out of the per-item loop and compiled once at
+# import; inline string patterns would pay re's cache lookup (at best) on
+# every product
+_BRAND_PATTERNS = {
+    'Chanel': ('chanel',),
+    'Louis Vuitton': ('louis vuitton', 'lv'),
+    'Hermès': ('hermès', 'hermes'),
+    'Gucci': ('gucci',),
+    'Dior': ('dior',),
+    'Prada': ('prada',),
+    'Bottega Veneta': ('bottega veneta',),
+    'Saint Laurent': ('saint laurent', 'ysl'),
+    'Celine': ('celine',),
+    'Balenciaga': ('balenciaga',),
+    'Fendi': ('fendi',),
+    'Givenchy': ('givenchy',),
+    'Valentino': ('valentino',),
+    'Versace': ('versace',),
+    'Burberry': ('burberry',),
+}
+
+# One Aho-Corasick automaton finds any brand alias in a single pass over
+# title+description, replacing up to 30 substring scans per item
+_BRAND_AUTOMATON = ahocorasick.Automaton()
+for _brand, _aliases in _BRAND_PATTERNS.items():
+    for _alias in _aliases:
+        _BRAND_AUTOMATON.add_word(_alias, _brand)
+_BRAND_AUTOMATON.make_automaton()
+
+# Each price pattern carries the currency symbol its match formats with
+_PRICE_PATTERNS = [
+    (re.compile(r'£(\d+(?:,\d+)*)', re.IGNORECASE), '£'),
+    (re.compile(r'(\d+(?:,\d+)*)\s*£', re.IGNORECASE), '£'),
+    (re.compile(r'€(\d+(?:,\d+)*)', re.IGNORECASE), '€'),
+    (re.compile(r'\$(\d+(?:,\d+)*)', re.IGNORECASE), '$'),
+    (re.compile(r'price[:\s]*(\d+(?:,\d+)*)', re.IGNORECASE), '£'),
+    (re.compile(r'cost[:\s]*(\d+(?:,\d+)*)', re.IGNORECASE), '£'),
+    (re.compile(r'(\d{1,4})\s*(?:pounds?|gbp|eur|usd)', re.IGNORECASE), '£'),
+]
+
+_IMAGE_RE = re.compile(r'https://images\.vestiairecollective\.com/[^\s\)]+')
+
+_CONDITION_PATTERNS = {
+    'Excellent': ('excellent condition', 'perfect condition', 'like new', 'mint condition'),
+    'Very Good': ('very good condition', 'great condition', 'excellent'),
+    'Good': ('good condition', 'used but good', 'fairly good'),
+    'Fair': ('fair condition', 'acceptable condition', 'worn but fair'),
+    'Poor': ('poor condition', 'heavily worn', 'damaged'),
+}
+
+# The condition keywords are plain literals, so they also collapse into one
+# automaton pass; matches are bucketed and resolved in table order to keep
+# the original Excellent-first priority
+_CONDITION_AUTOMATON = ahocorasick.Automaton()
+for _cond, _phrases in _CONDITION_PATTERNS.items():
+    for _phrase in _phrases:
+        _CONDITION_AUTOMATON.add_word(_phrase, _cond)
+_CONDITION_AUTOMATON.make_automaton()
+_CONDITION_ORDER = tuple(_CONDITION_PATTERNS)
+
+_SELLER_PATTERNS = [
+    re.compile(r'sold by\s+([^\s.,]+)', re.IGNORECASE),
+    re.compile(r'seller[:\s]+([^\s.,]+)', re.IGNORECASE),
+    re.compile(r'from\s+([^\s.,]+)\s+shop', re.IGNORECASE),
+]
+
+# Built once instead of per call; the headers never vary and the search
+# params only change in query/page/limit
+_API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-GB,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Referer': 'https://www.vestiairecollective.co.uk/',
+    'Origin': 'https://www.vestiairecollective.co.uk',
+    'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"',
+    'sec-fetch-dest': 'empty',
+    'sec-fetch-mode': 'cors',
+    'sec-fetch-site': 'same-site',
+}
+
+_API_PARAMS_TEMPLATE = {
+    'sort': 'relevance',
+    'category_id': '1',  # Bags category
+    'gender': 'women',
+    'locale': {'country': 'GB', 'language': 'en', 'currency': 'GBP'}
+}
+
+_SIZE_PATTERNS = [
+    re.compile(r'size\s+([A-Z0-9]+)', re.IGNORECASE),
+    re.compile(r'([A-Z0-9]+)\s*size', re.IGNORECASE),
+    re.compile(r'uk\s*size\s+(\w+)', re.IGNORECASE),
+    re.compile(r'eu\s*size\s+(\w+)', re.IGNORECASE),
+    re.compile(r'us\s*size\s+(\w+)', re.IGNORECASE),
+]
 
 def scrape_vestiaire_data(search_text, page_number=1, items_per_page=50, min_price=None, max_price=None, country='uk'):
     """Clean Vestiaire scraper using official Product Search API"""
     
     api_url = "https://search.vestiairecollective.com/v1/product/search"
     
-    params = {
-        'q': search_text,
-        'page': page_number,
-        'limit': items_per_page,
-        'sort': 'relevance',
-        'category_id': '1',  # Bags category
-        'gender': 'women',
-        'locale': {'country': 'GB', 'language': 'en', 'currency': 'GBP'}
-    }
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'application/json, text/plain, */*',
-        'Accept-Language': 'en-GB,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Referer': 'https://www.vestiairecollective.co.uk/',
-        'Origin': 'https://www.vestiairecollective.co.uk',
-        'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"macOS"',
-        'sec-fetch-dest': 'empty',
-        'sec-fetch-mode': 'cors',
-        'sec-fetch-site': 'same-site',
-    }
-    
+    params = {**_API_PARAMS_TEMPLATE, 'q': search_text, 'page': page_number, 'limit': items_per_page}
+
     try:
         print(f"🔄 Calling Vestiaire API: {api_url}")
         print(f"📝 Query params: {params}")
-        
+
         # Make POST request
-        response = requests.post(api_url, json=params, headers=headers, timeout=15)
+        response = requests.post(api_url, json=params, headers=_API_HEADERS, timeout=15)
         
         if response.status_code == 200:
-            # Handle compression decompression
-            response_text = response.text
-            content_encoding = response.headers.get('content-encoding', '')
-            
-            if content_encoding == 'br':
-                try:
-                    response_text = brotli.decompress(response.content).decode('utf-8')
-                    print("📄 Decompressed brotli response")
-                except:
-                    print("📄 Failed to decompress brotli, using raw text")
-            
-            data = json.loads(response_text)
+            # urllib3 already decodes gzip/deflate (and brotli with the codec
+            # installed) transparently, so .content is plain JSON bytes
+            data = orjson.loads(response.content)
             products = []
             
             # Extract products from API response
@@ -62,10 +133,13 @@ def scrape_vestiaire_data(search_text, page_number=1, items_per_page=50, min_pri
                 for item in data['items']:
                     try:
                         # Extract basic product information
-                        product_id = item.get('id', '')
-                        title = item.get('name', '')
-                        description = item.get('description', '')
-                        relative_link = item.get('link', '')
+                        try:
+                            product_id, title, description, relative_link = _ITEM_FIELDS(item)
+                        except KeyError:
+                            product_id = item.get('id', '')
+                            title = item.get('name', '')
+                            description = item.get('description', '')
+                            relative_link = item.get('link', '')
                         
                         # Build full URL
                         product_url = f"https://www.vestiairecollective.co.uk{relative_link}" if relative_link else ''
@@ -73,117 +147,57 @@ def scrape_vestiaire_data(search_text, page_number=1, items_per_page=50, min_pri
                         # Extract brand from title or description with better detection
                         brand = 'Unknown'
                         title_lower = title.lower()
+                        # Lowercased once per item and shared by the brand and
+                        # condition scans below
                         desc_lower = description.lower()
-                        
-                        # Comprehensive brand detection
-                        brand_patterns = {
-                            'Chanel': ['chanel'],
-                            'Louis Vuitton': ['louis vuitton', 'lv'],
-                            'Hermès': ['hermès', 'hermes'],
-                            'Gucci': ['gucci'],
-                            'Dior': ['dior'],
-                            'Prada': ['prada'],
-                            'Bottega Veneta': ['bottega veneta'],
-                            'Saint Laurent': ['saint laurent', 'ysl'],
-                            'Celine': ['celine'],
-                            'Balenciaga': ['balenciaga'],
-                            'Fendi': ['fendi'],
-                            'Givenchy': ['givenchy'],
-                            'Valentino': ['valentino'],
-                            'Versace': ['versace'],
-                            'Burberry': ['burberry']
-                        }
-                        
-                        for brand_name, patterns in brand_patterns.items():
-                            if any(pattern in title_lower or pattern in desc_lower for pattern in patterns):
-                                brand = brand_name
-                                break
-                        
+
+                        for _, brand_name in _BRAND_AUTOMATON.iter(title_lower + ' ' + desc_lower):
+                            brand = brand_name
+                            break
+
                         # Enhanced price extraction from description
                         price = 'Price not available'
-                        
-                        # Multiple price patterns to try
-                        price_patterns = [
-                            r'£(\d+(?:,\d+)*)',
-                            r'(\d+(?:,\d+)*)\s*£',
-                            r'€(\d+(?:,\d+)*)',
-                            r'\$(\d+(?:,\d+)*)',
-                            r'price[:\s]*(\d+(?:,\d+)*)',
-                            r'cost[:\s]*(\d+(?:,\d+)*)',
-                            r'(\d{1,4})\s*(?:pounds?|gbp|eur|usd)'
-                        ]
-                        
-                        for pattern in price_patterns:
-                            price_match = re.search(pattern, description, re.IGNORECASE)
+
+                        for pattern, symbol in _PRICE_PATTERNS:
+                            price_match = pattern.search(description)
                             if price_match:
                                 price_num = price_match.group(1).replace(',', '')
                                 try:
                                     price_value = int(price_num)
                                     if price_value > 100:  # Filter out very small numbers
-                                        if '£' in pattern or 'gbp' in pattern or 'pounds' in pattern:
-                                            price = f"£{price_value:,}"
-                                        elif '€' in pattern or 'eur' in pattern:
-                                            price = f"€{price_value:,}"
-                                        elif '$' in pattern or 'usd' in pattern:
-                                            price = f"${price_value:,}"
-                                        else:
-                                            price = f"£{price_value:,}"  # Default to GBP
+                                        price = f"{symbol}{price_value:,}"
                                         break
                                 except ValueError:
                                     continue
-                        
+
                         # Enhanced image URL generation
                         image_url = f"https://images.vestiairecollective.com/images/resized/w=256,q=75,f=auto/produit/{product_id}_1.jpg"
-                        
+
                         # Try to extract actual image from description if available
-                        image_match = re.search(r'https://images\.vestiairecollective\.com/[^\s\)]+', description)
+                        image_match = _IMAGE_RE.search(description)
                         if image_match:
                             image_url = image_match.group(0)
-                        
+
                         # Enhanced condition extraction
                         condition = 'Good'
-                        condition_patterns = {
-                            'Excellent': ['excellent condition', 'perfect condition', 'like new', 'mint condition'],
-                            'Very Good': ['very good condition', 'great condition', 'excellent'],
-                            'Good': ['good condition', 'used but good', 'fairly good'],
-                            'Fair': ['fair condition', 'acceptable condition', 'worn but fair'],
-                            'Poor': ['poor condition', 'heavily worn', 'damaged']
-                        }
-                        
-                        desc_lower = description.lower()
-                        for cond_name, patterns in condition_patterns.items():
-                            if any(pattern in desc_lower for pattern in patterns):
-                                condition = cond_name
-                                break
-                        
+                        found = {cond for _, cond in _CONDITION_AUTOMATON.iter(desc_lower)}
+                        if found:
+                            condition = next(c for c in _CONDITION_ORDER if c in found)
+
                         # Enhanced seller extraction
                         seller = 'vestiaire_seller'
-                        
+
                         # Try to extract seller from description
-                        seller_patterns = [
-                            r'sold by\s+([^\s.,]+)',
-                            r'seller[:\s]+([^\s.,]+)',
-                            r'from\s+([^\s.,]+)\s+shop'
-                        ]
-                        
-                        for pattern in seller_patterns:
-                            seller_match = re.search(pattern, description, re.IGNORECASE)
+                        for pattern in _SELLER_PATTERNS:
+                            seller_match = pattern.search(description)
                             if seller_match:
                                 seller = seller_match.group(1).title()
                                 break
-                        
+
                         # Extract size information
                         size = 'N/A'
-                        size_patterns = [
-                            r'size\s+([A-Z0-9]+)',
-                            r'([A-Z0-9]+)\s*size',
-                            r'uk\s*size\s+(\w+)',
-                            r'eu\s*size\s+(\w+)',
-                            r'us\s*size\s+(\w+)'
-                        ]
-                        
-                        for pattern in size_patterns:
-                            size_match = re.search(pattern, description, re.IGNORECASE)
+                        for pattern in _SIZE_PATTERNS:
+                            size_match = pattern.search(description)
                             if size_match:
                                 size = size_match.group(1).upper()
                                 break